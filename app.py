@@ -1,11 +1,26 @@
 import streamlit as st
-from PIL import Image
-import torch
-from transformers import AutoImageProcessor, AutoModelForImageClassification
 import time
 import datetime
-import requests
 import os 
+import csv
+import io
+# torch / transformers / inference yahan import NAHI hote: Home page unke baghair khulta hai
+from model_registry import ModelRegistry, discover_models
+from history import HistoryStore, day_of
+from ingestion import BUDGET as DECODE_BUDGET, UploadRejected, admitted, release_freed_images, resize_bytes
+from prediction_cache import PredictionCache, content_key, key_hash, model_revision
+from settings import MODEL_PATH, MODEL_PATH_SET, CONFIDENCE_THRESHOLD, MODELS_DIR, MODEL_MEMORY_BUDGET_MB
+from settings import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DIR, PREDICTION_CACHE_DISK_SIZE
+from settings import DEBUG, METRICS_PORT, METRICS_FILE, PRECISION, BACKEND, invalid_settings
+from settings import FARM_LOCATIONS, WEATHER_URL, WEATHER_TTL
+from settings import INFERENCE_WORKERS, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS, INFERENCE_PIN_CORES, INFERENCE_TIMEOUT
+from settings import CASCADE, CASCADE_SIZE, CASCADE_LAYERS, CASCADE_THRESHOLD, CASCADE_MARGIN
+from settings import FIELD_MAX_SIDE, TILE_STRIDE, TILE_BATCH, TILE_MEMORY_MB
+from settings import EMBEDDING_INDEX_DIR, SIMILARITY_THRESHOLD, SIMILAR_CASES, INDEX_MODE
+from settings import HISTORY_DB
+from settings import TTA, TTA_VARIANTS, TTA_BUDGET_MS
+from timing import REGISTRY, StageTimer, start_metrics_server
+from weather import WeatherService, parse_locations
 
 # --- 1. PAGE SETUP ---
 st.set_page_config(
@@ -15,19 +30,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- 2. ROBUST WEATHER FUNCTION ---
-def get_real_weather():
-    try:
-        url = "https://api.open-meteo.com/v1/forecast?latitude=31.5204&longitude=74.3587&current_weather=true"
-        response = requests.get(url, timeout=3) 
-        data = response.json()
-        temp = data['current_weather']['temperature']
-        wind = data['current_weather']['windspeed']
-        return temp, wind
-    except:
-        return 28, 12 # Fallback Data
+# --- 2. WEATHER SERVICE (sab sessions ka ek cache, page kabhi API ka intezar nahi karta) ---
+@st.cache_resource
+def get_weather_service():
+    service = WeatherService(parse_locations(FARM_LOCATIONS), WEATHER_URL, WEATHER_TTL)
+    service.warm()
+    return service
 
-temp, wind = get_real_weather()
+weather_service = get_weather_service()
 
 # --- 3. ULTRA PREMIUM CSS (Height Match Fix - 420px) ---
 st.markdown("""
@@ -171,25 +181,105 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- 4. MODEL LOADING (FIXED - NO AUTO CHECK) ---
+# --- 4. MODEL LOADING (REGISTRY: har fasal ka model on demand, background thread mein) ---
+CROP_PAGES = {"🥔 Potato (Aloo)": "potato", "🍅 Tomato Check": "tomato", "🌽 Corn Field": "corn"}
+
+# Galat precision / backend ko "Model Folder Missing" ke peeche na chhupao: model load se pehle asal ghalti
+for name, value, allowed in invalid_settings():
+    st.error(f"⚠️ **Invalid setting:** `{name}={value}` — expected one of {', '.join(allowed)}.")
+if invalid_settings():
+    st.stop()
+
 @st.cache_resource
-def load_model():
-    try:
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        
-        # --- FIXED PATH: Direct folder name ---
-        model_path = "mera_potato_model"
-            
-        model = AutoModelForImageClassification.from_pretrained(model_path).to(device)
-        processor = AutoImageProcessor.from_pretrained(model_path)
-        model.eval() 
-        return model, processor, device
-    except Exception as e:
-        # Error print karega agar phir bhi masla hua
-        print(f"Error: {e}")
-        return None, None, "cpu"
+def get_model_registry():
+    models = discover_models(".", MODELS_DIR)
+    # --- FIXED PATH: Direct folder name --- (na mile to Potato page error dikhata hai)
+    # PLANT_DOCTOR_MODEL_PATH khud set kiya ho to wahi chalega, chahe mera_potato_model folder bhi mil jaye
+    if MODEL_PATH_SET:
+        models["potato"] = MODEL_PATH
+    else:
+        models.setdefault("potato", MODEL_PATH)
+    # Har model ka apna worker pool; saare sessions usi ko requests bhejte hain (micro-batching)
+    service_options = {"workers": INFERENCE_WORKERS, "max_batch": INFERENCE_MAX_BATCH,
+                       "max_wait_ms": INFERENCE_MAX_WAIT_MS, "pin_cores": INFERENCE_PIN_CORES,
+                       "timeout": INFERENCE_TIMEOUT}
+    cascade = {"size": CASCADE_SIZE, "layers": CASCADE_LAYERS, "threshold": CASCADE_THRESHOLD,
+               "margin": CASCADE_MARGIN} if CASCADE else None
+    registry = ModelRegistry(models, MODEL_MEMORY_BUDGET_MB * 1024 * 1024, PRECISION, BACKEND,
+                             service_options=service_options, cascade=cascade)
+    registry.request("potato")  # pehle session ke saath hi warm hona shuru
+    return registry
+
+model_registry = get_model_registry()
+
+# Saare sessions ek hi cache share karte hain (hash of photo bytes + model revision)
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DIR, PREDICTION_CACHE_DISK_SIZE)
+
+prediction_cache = get_prediction_cache()
+
+# Upload decode memory: free hui image memory OS ko wapas, process start par ek hi baar (wajah ingestion.py mein)
+@st.cache_resource
+def setup_image_memory():
+    return release_freed_images()
+
+setup_image_memory()
 
-model, processor, device = load_model()
+# Har result ki history (SQLite); likhna background thread mein, page kabhi disk ka intezar nahi karta
+@st.cache_resource
+def get_history_store():
+    return HistoryStore(HISTORY_DB) if HISTORY_DB else None
+
+history_store = get_history_store()
+
+def record_diagnosis(crop, cache_key, probs, labels, revision, source, stages=None, verdict=None):
+    # verdict: field photo ka field_verdict (jawab tiles ki voting se, probs sirf tiles ka average)
+    if history_store is None:
+        return
+    # Har rerun (Download button, toggle, sidebar) wahi result cache se dobara dikhata hai: ye naya diagnosis
+    # nahi. Ek session mein har upload ki sirf ek row
+    recorded = st.session_state.setdefault("recorded_diagnoses", set())
+    if cache_key in recorded:
+        return
+    recorded.add(cache_key)
+    idx = max(range(len(probs)), key=probs.__getitem__)
+    conf, accepted = probs[idx] * 100, probs[idx] * 100 >= CONFIDENCE_THRESHOLD
+    if verdict is not None and verdict["label"] is not None:
+        idx, conf, accepted = verdict["label"], verdict["confidence"], True
+    elif verdict is not None:
+        accepted = False
+    history_store.record(crop, key_hash(cache_key), probs, labels[idx], conf, accepted, source, revision, stages)
+
+# Har fasal + model revision ka apna embedding index (memory-mapped: restart par foran khulta hai)
+@st.cache_resource
+def get_embedding_index(crop, revision, dim, num_labels):
+    from cascade import CHEAP_SIZE
+    from embedding_index import EmbeddingIndex
+    # Folder mein vector ka source: sasta CHEAP_SIZE px CLS pass (poore forward wale "-cls" vectors is mein nahi milte)
+    return EmbeddingIndex(os.path.join(EMBEDDING_INDEX_DIR, f"{crop}-{revision}-cls{CHEAP_SIZE}"), dim, num_labels,
+                          INDEX_MODE)
+
+# --- 4b. TIMING / METRICS (/metrics endpoint sirf PLANT_DOCTOR_METRICS_PORT set ho to) ---
+@st.cache_resource
+def get_metrics_server():
+    return start_metrics_server(METRICS_PORT) if METRICS_PORT else None
+
+get_metrics_server()
+debug_mode = DEBUG or st.query_params.get("debug") == "1"
+
+def finish_timing(timer):
+    timer.end("render")
+    REGISTRY.record(timer)
+    if METRICS_FILE:
+        REGISTRY.write_file(METRICS_FILE)
+    if debug_mode:
+        with st.expander("⏱️ Timing Breakdown"):
+            st.dataframe([{"stage": s, "ms": round(v * 1000, 1)} for s, v in timer.stages.items()]
+                         + [{"stage": "total", "ms": round(timer.total() * 1000, 1)}], use_container_width=True)
+            st.write("**Rolling percentiles (ms)**")
+            st.dataframe([{"stage": s, **{f"p{int(q * 100)}": round(v * 1000, 1) for q, v in qs.items()}}
+                          for s, qs in REGISTRY.summary().items()], use_container_width=True)
 
 # --- 5. SIDEBAR ---
 st.sidebar.markdown("""
@@ -205,11 +295,47 @@ st.sidebar.markdown("<h1 style='text-align: center; color: white; font-weight: 8
 st.sidebar.markdown("<p style='text-align: center; font-size: 0.9rem; opacity: 0.9; margin-bottom: 30px; letter-spacing: 2px; font-weight: 600;'>AI DIAGNOSTICS</p>", unsafe_allow_html=True)
 st.sidebar.write("---")
 
-nav = st.sidebar.radio("", ["🏠 Home Page", "🥔 Potato (Aloo)", "🍅 Tomato Check", "🌽 Corn Field"])
+nav = st.sidebar.radio("", ["🏠 Home Page", "🥔 Potato (Aloo)", "🍅 Tomato Check", "🌽 Corn Field", "📊 Dashboard"])
 
 st.sidebar.write("---")
 with st.sidebar.expander("📸 Tips for Best Results"):
     st.markdown("* ☀️ **Lighting:** Use bright daylight.\n* 🍃 **Focus:** Capture only the leaf.\n* 🖼️ **Background:** Keep it plain.")
+with st.sidebar.expander("🧠 Prediction Cache"):
+    cache_stats = prediction_cache.stats()
+    st.markdown(f"* **Hits:** {cache_stats['hits']} (disk: {cache_stats['disk_hits']})\n* **Misses:** {cache_stats['misses']}\n"
+                f"* **Hit Rate:** {cache_stats['hit_rate']:.0%}\n* **Entries:** {cache_stats['entries']} / {cache_stats['max_entries']}")
+    if prediction_cache.disk_dir:
+        st.markdown(f"* **Disk:** {cache_stats['disk_entries']} files · {cache_stats['disk_evictions']} pruned · "
+                    f"{cache_stats['disk_errors']} write errors")
+with st.sidebar.expander("📦 Crop Models"):
+    registry_stats = model_registry.stats()
+    for crop, s in registry_stats["models"].items():
+        load = f"{s['load_s']:.1f}s" if s["load_s"] is not None else "-"
+        st.markdown(f"**{crop.title()}** · {s['state']} · {s['resident_bytes'] / 2**20:.0f} MB · load {load} · "
+                    f"hits {s['hits']} / misses {s['misses']}")
+    budget = f"{registry_stats['budget_bytes'] / 2**20:.0f} MB" if registry_stats["budget_bytes"] else "no limit"
+    st.caption(f"Resident {registry_stats['resident_bytes'] / 2**20:.0f} MB of {budget} · "
+               f"hit rate {registry_stats['hit_rate']:.0%}")
+with st.sidebar.expander("⚙️ Inference Queue"):
+    for crop, loader in ((c, model_registry.peek(c)) for c in model_registry.models):
+        if loader is not None and loader.service is not None:
+            q = loader.service.stats()
+            batches = ", ".join(f"{size}×{count}" for size, count in q["batch_sizes"].items()) or "-"
+            st.markdown(f"**{crop.title()}** · {q['workers']} worker(s) · queue {q['queue_depth']} · "
+                        f"{q['requests']} requests\n\n* **Batch sizes:** {batches}\n"
+                        f"* **Wait p50/p95:** {q['wait_ms']['p50']:.0f} / {q['wait_ms']['p95']:.0f} ms\n"
+                        f"* **Compute p50/p95:** {q['compute_ms']['p50']:.0f} / {q['compute_ms']['p95']:.0f} ms")
+            if hasattr(loader.model, "early"):
+                c = loader.model.stats()
+                st.caption(f"Cascade: {c['early']} early / {c['escalated']} full model ({c['early_rate']:.0%} early)")
+    d = DECODE_BUDGET.stats()
+    st.caption(f"Decode memory: {d['in_use_mb']:.0f} / {d['limit_mb']:.0f} MB (peak {d['peak_mb']:.0f}) · "
+               f"{d['waits']} waited · {d['rejected']} rejected")
+if debug_mode:
+    with st.sidebar.expander("🚀 Startup Profile"):
+        for crop, loader in ((c, model_registry.peek(c)) for c in model_registry.models):
+            if loader is not None:
+                st.json({crop: loader.report()})
 st.sidebar.write("---")
 st.sidebar.info("**Developers:**\n\n👨‍💻 **Saqlain Khan**\n(Data Engineer)\n\n👨‍💻 **Raheel Chishti**\n(Team Member)")
 
@@ -247,6 +373,10 @@ if nav == "🏠 Home Page":
         """, unsafe_allow_html=True)
         
     with col2:
+        farms = list(weather_service.locations)
+        farm = st.selectbox("📍 Farm", farms, label_visibility="collapsed") if len(farms) > 1 else farms[0]
+        weather = weather_service.get(farm)
+        temp, wind = weather["temp"], weather["wind"]
         if temp > 30:
             card_bg = "linear-gradient(145deg, #f59e0b 0%, #ea580c 100%)"
             weather_icon = "☀️"
@@ -265,8 +395,8 @@ if nav == "🏠 Home Page":
             <div class="weather-glow"></div>
             <div class="weather-content">
                 <div class="weather-header">
-                    <div class="live-badge"><div class="live-dot"></div> LIVE</div>
-                    <div style="font-weight:600; font-size:0.9rem; color:rgba(255,255,255,0.9);">📍 Punjab</div>
+                    <div class="live-badge"><div class="live-dot"></div> {"LIVE" if weather["live"] else "OFFLINE"}</div>
+                    <div style="font-weight:600; font-size:0.9rem; color:rgba(255,255,255,0.9);">📍 {farm}</div>
                 </div>
                 <div class="weather-icon-3d">{weather_icon}</div>
                 <div class="temp-big">{temp}°</div>
@@ -338,46 +468,286 @@ if nav == "🏠 Home Page":
     </div>
     """, unsafe_allow_html=True)
 
-elif nav == "🥔 Potato (Aloo)":
-    st.header("🥔 Aloo Ki Bimari Check Karein", anchor="alookibimaricheckkarein")
-    
-    if not model:
-        st.error("⚠️ **Model Folder Missing!**")
-        st.info("Ensure `config.json` and `model.safetensors` are in the same folder as `app.py` or in `mera_potato_model` folder.")
+elif nav == "🥔 Potato (Aloo)" or CROP_PAGES.get(nav) in model_registry.models:
+    crop = CROP_PAGES[nav]
+    crop_name = "Aloo" if crop == "potato" else crop.title()
+    if crop == "potato":
+        st.header("🥔 Aloo Ki Bimari Check Karein", anchor="alookibimaricheckkarein")
+    else:
+        st.header(f"{nav.split(' ')[0]} {crop_name} Ki Bimari Check Karein")
+
+    model_loader = model_registry.request(crop)
+    if not model_loader.wait(timeout=2):
+        # Block nahi karte: warming message dikha kar thori der baad khud rerun
+        st.info("⏳ **Model warm ho raha hai...** Pehli baar thora waqt lagta hai, page khud refresh hoga.")
+        time.sleep(1)
+        st.rerun()
+
+    if model_loader.state != "ready":
+        if isinstance(model_loader.error, OSError):
+            st.error("⚠️ **Model Folder Missing!**")
+            st.info("Ensure `config.json` and `model.safetensors` are in the same folder as `app.py` or in `mera_potato_model` folder.")
+        else:
+            st.error(f"⚠️ **Model load nahi ho saka:** {model_loader.error}")
         st.stop()
-    
+
+    from inference import IMAGE_TYPES, MAX_UPLOAD_BYTES, pretty_label, predict_probs, iter_batches, count_uploads, expand_uploads
+    from inference import embed_images
+    from inference_service import ServiceClosed
+    from preprocessing import PREVIEW_SIDE
+    # Queue mein intezar INFERENCE_TIMEOUT se lamba ho gaya, ya model dobara load na ho saka: traceback nahi, ye message
+    SERVER_BUSY = (TimeoutError, ServiceClosed)
+    BUSY_MESSAGE = "⏳ **Server Busy Hai!** Thori der baad dobara koshish karein."
+    model, processor, device = model_loader.model, model_loader.processor, model_loader.device
+    # Precision badle to outputs badalte hain, is liye cache key mein shamil
+    model_rev = f"{model_revision(model_loader.model_path)}-{PRECISION}"
+    if hasattr(model, "early"):
+        # Cascade ke jawab poore model se alag ho sakte hain: cache bhi alag
+        model_rev += f"-cascade{model.size}x{model.layers}@{model.threshold}/{model.margin}"
+    from embedding_index import normalize
+    embedding_index = (get_embedding_index(crop, model_rev, model.config.hidden_size, model.config.num_labels)
+                       if EMBEDDING_INDEX_DIR else None)
+
+    mode = st.radio("Mode", ["📷 Single Photo", "📦 Batch (Many Photos)", "🗺️ Field Photo (Tiled)"], horizontal=True)
+
+    # --- FIELD MODE: kai pattay ek photo mein, overlapping tiles + bimari ka heatmap ---
+    if mode == "🗺️ Field Photo (Tiled)":
+        from tiling import classify_tiles, disease_map, field_verdict, fit_to_grid, heatmap_overlay
+
+        field_file = st.file_uploader("Upload Field Photo", type=IMAGE_TYPES, max_upload_size=MAX_UPLOAD_BYTES >> 20)
+        if field_file is not None and field_file.size > MAX_UPLOAD_BYTES:
+            st.error("⚠️ File size too large! Please upload image under 5MB.")
+        elif field_file:
+            labels = [pretty_label(model, i) for i in range(model.config.num_labels)]
+            try:
+                # Header check pehle; bari photo ka decode memory budget ke andar
+                data = field_file.getvalue()
+                with admitted(data, (FIELD_MAX_SIDE, FIELD_MAX_SIDE),
+                              work=lambda size: resize_bytes(size, (FIELD_MAX_SIDE, FIELD_MAX_SIDE))):
+                    field = fit_to_grid(processor, data, TILE_STRIDE, FIELD_MAX_SIDE)
+            except UploadRejected as e:
+                st.error(f"⚠️ **Photo load nahi ho saki:** {e}")
+                st.stop()
+            with st.spinner("Poori photo ke hissay check ho rahe hain..."):
+                start = time.perf_counter()
+                # Tiles ka grid bhi cache mein: har rerun par poori tile inference dobara nahi. Tiling settings
+                # revision mein (photo ka hash key ke aakhir mein hi rehta hai, history usi se)
+                field_key = content_key(data, f"{model_rev}-field{TILE_STRIDE}x{FIELD_MAX_SIDE}")
+                grid = prediction_cache.get(field_key)
+                field_source = "cache" if grid is not None else "field"
+                if grid is None:
+                    try:
+                        grid = model_registry.run(crop, model_loader, lambda l: classify_tiles(
+                            l.model, l.processor, field, l.device, TILE_STRIDE, TILE_BATCH, TILE_MEMORY_MB,
+                            service=l.service))
+                    except SERVER_BUSY:
+                        st.error(BUSY_MESSAGE)
+                        st.stop()
+                    prediction_cache.put(field_key, grid)
+                cells = disease_map(grid, labels, processor.size[0], TILE_STRIDE)
+                verdict = field_verdict(grid, labels, CONFIDENCE_THRESHOLD)
+                elapsed = time.perf_counter() - start
+            record_diagnosis(crop, field_key, grid.reshape(-1, grid.shape[-1]).mean(0).tolist(), labels, model_rev,
+                             field_source, verdict=verdict)
+            col1, col2 = st.columns([1.5, 1])
+            with col1:
+                st.image(heatmap_overlay(field, cells), caption="Laal = bimari, sabz = theek", use_container_width=True)
+            with col2:
+                if verdict["status"] == "uncertain":
+                    st.error("⚠️ **Photo Clear Nahi Hai!**")
+                    st.warning(f"Kisi bhi hissay mein {CONFIDENCE_THRESHOLD}% confidence nahi mila. Saaf photo upload karein.")
+                else:
+                    color = "#059669" if verdict["status"] == "healthy" else "#dc2626"
+                    st.markdown(f"""
+                    <div class='result-box' style='border: 2px solid {color};'>
+                        <h2 style='color: {color}; margin:0; font-weight: 800;'>{labels[verdict["label"]]}</h2>
+                        <h4 style='color: {color}; margin-top: 10px; font-weight: 600;'>Confidence: {verdict["confidence"]:.1f}%</h4>
+                        <p style='font-weight: 600;'>Bimar hissay: {verdict["affected_share"]:.0%}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                st.caption(f"{verdict['tiles']} tiles ({grid.shape[1]}×{grid.shape[0]}) in {elapsed:.1f}s · "
+                           f"{verdict['confident_share']:.0%} confident")
+                if field_source == "cache":
+                    st.caption("⚡ Ye photo pehle check ho chuki hai — result cache se aaya.")
+        st.stop()
+
+    # --- BATCH MODE: Bohot saari photos / zip, batches mein forward pass ---
+    if mode == "📦 Batch (Many Photos)":
+        files = st.file_uploader("Upload Leaf Photos or a .zip", type=IMAGE_TYPES + ["zip"], accept_multiple_files=True)
+        batch_size = st.select_slider("Batch Size", options=[1, 4, 8, 16, 32], value=8)
+        labels = [pretty_label(model, i) for i in range(model.config.num_labels)]
+
+        def batch_csv(rows):
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, fieldnames=["file", "diagnosis", "confidence", "status"] + labels)
+            writer.writeheader()
+            writer.writerows(rows)
+            return buf.getvalue()
+
+        if files and st.button("🚀 Start Batch Diagnosis"):
+            total = count_uploads(files)
+            rows = []
+            progress = st.progress(0)
+            table_slot = st.empty()
+            csv_slot = st.empty()
+            start = time.perf_counter()
+            for n, batch in enumerate(iter_batches(expand_uploads(files), batch_size)):
+                names, keys, images, results = [], [], [], []
+                for name, data in batch:
+                    if data is None:
+                        rows.append({"file": name, "status": "Too Large (>5MB)"})
+                        continue
+                    key = content_key(data, model_rev)
+                    cached = prediction_cache.get(key)
+                    if cached is not None:
+                        results.append((name, key, cached.tolist(), "cache"))
+                        continue
+                    try:
+                        with admitted(data, processor.size, work=processor.working_bytes):
+                            images.append(processor.resize(processor.open(data)))
+                        names.append(name)
+                        keys.append(key)
+                    except UploadRejected as e:
+                        rows.append({"file": name, "status": str(e)})
+                if images:
+                    try:
+                        probs = model_registry.run(crop, model_loader, lambda l: predict_probs(
+                            l.model, l.processor, images, l.device, service=l.service)).numpy()
+                    except SERVER_BUSY:
+                        # UploadRejected jaisa: sirf is batch ki photos ka status, baqi batch chalta rahe
+                        rows.extend({"file": name, "status": "Server Busy, Try Again"} for name in names)
+                        probs = []
+                    for name, key, p in zip(names, keys, probs):
+                        prediction_cache.put(key, p)
+                        results.append((name, key, p.tolist(), "batch"))
+                for name, key, p, source in results:
+                    record_diagnosis(crop, key, p, labels, model_rev, source)
+                    idx = max(range(len(p)), key=p.__getitem__)
+                    conf = p[idx] * 100
+                    row = {"file": name, "diagnosis": labels[idx], "confidence": round(conf, 1),
+                           "status": "OK" if conf >= CONFIDENCE_THRESHOLD else "Low Confidence"}
+                    row.update({l: round(v * 100, 1) for l, v in zip(labels, p)})
+                    rows.append(row)
+                progress.progress(min(len(rows) / max(total, 1), 1.0), text=f"{len(rows)} / {total} photos")
+                table_slot.dataframe(rows, use_container_width=True)
+                csv_slot.download_button("📥 Download CSV (so far)", batch_csv(rows), file_name="plant_doctor_batch.csv",
+                                         mime="text/csv", key=f"batch_csv_{n}")
+            elapsed = time.perf_counter() - start
+            st.session_state["batch_rows"] = rows
+            st.session_state["batch_speed"] = (len(rows), elapsed, batch_size)
+            csv_slot.empty()
+            table_slot.empty()
+
+        # Download click se rerun hota hai, is liye results session mein rakhe hain
+        if st.session_state.get("batch_rows"):
+            rows = st.session_state["batch_rows"]
+            done, elapsed, used_batch = st.session_state["batch_speed"]
+            st.success(f"✅ {done} photos in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.1f} images/sec @ batch size {used_batch})")
+            st.dataframe(rows, use_container_width=True)
+            st.download_button("📥 Download CSV", batch_csv(rows), file_name="plant_doctor_batch.csv", mime="text/csv")
+        st.stop()
+
     # --- HERE IS THE FIX: Added "jpeg" and "webp" and "jfif" ---
-    uploaded_file = st.file_uploader("Upload Leaf Photo", type=["jpg", "png", "jpeg", "webp", "jfif"])
+    uploaded_file = st.file_uploader("Upload Leaf Photo", type=IMAGE_TYPES, max_upload_size=MAX_UPLOAD_BYTES >> 20)
+    use_tta = st.toggle("🔁 Unclear photo par dobara koshish (TTA)", value=TTA)
     
-    if uploaded_file is not None and uploaded_file.size > 5*1024*1024:
+    if uploaded_file is not None and uploaded_file.size > MAX_UPLOAD_BYTES:
         st.error("⚠️ File size too large! Please upload image under 5MB.")
     elif uploaded_file:
+        timer = StageTimer()
+        data = uploaded_file.getvalue()
+        with timer.stage("cache_lookup"):
+            cache_key = content_key(data, model_rev)
+            probs = prediction_cache.get(cache_key)
+        from_cache = probs is not None
         col1, col2 = st.columns([1, 1.5])
         with col1:
-            display_image = Image.open(uploaded_file).convert('RGB')
-            st.image(display_image, caption="Uploaded Photo", use_column_width=True)
+            # JPEG reduced-scale decode: model ke liye 224x224, screen ke liye chhota preview
+            try:
+                with timer.stage("decode"), admitted(data, (PREVIEW_SIDE, PREVIEW_SIDE),
+                                                     work=lambda size: processor.working_bytes(size, PREVIEW_SIDE)):
+                    model_image, preview_image = processor.decode(data)
+            except UploadRejected as e:
+                st.error(f"⚠️ **Photo load nahi ho saki:** {e}")
+                st.stop()
+            st.image(preview_image, caption="Uploaded Photo", use_column_width=True)
         
         with col2:
             with st.spinner("Analyzing..."):
-                time.sleep(1) 
-                
-                import torch
-                model_image = display_image.resize((224, 224)) 
-                inputs = processor(images=model_image, return_tensors="pt").to(device)
-                
-                with torch.no_grad():
-                    outputs = model(**inputs)
-                    logits = outputs.logits
-                    idx = logits.argmax(-1).item()
-                    conf = torch.softmax(logits, dim=1)[0][idx].item() * 100
-                    label = model.config.id2label[idx].replace("_", " ").title()
-                    probs = torch.softmax(logits, dim=1)[0].tolist()
-                    labels = [model.config.id2label[i].replace("_", " ").title() for i in range(len(probs))]
-                    prob_dict = {l: p*100 for l, p in zip(labels, probs)}
+                similar, from_similar, vectors = [], False, None
+                try:
+                    if probs is None and embedding_index is not None:
+                        # Milti julti photo (re-crop, WhatsApp copy) pehle check hui ho to uska jawab: sasta CLS pass
+                        # (shared queue se), poora forward aur sleep nahi
+                        vectors = normalize(model_registry.run(crop, model_loader, lambda l: embed_images(
+                            l.model, l.processor, [model_image], l.device, timer=timer, service=l.service)))
+                        if vectors is not None:
+                            with timer.stage("index_search"):
+                                similar = embedding_index.search(vectors[0], SIMILAR_CASES)
+                            if similar and similar[0]["similarity"] >= SIMILARITY_THRESHOLD:
+                                probs, from_similar = similar[0]["probs"], True
+                                embedding_index.reuses += 1
+                                prediction_cache.put(cache_key, probs)
+                    if probs is None:
+                        with timer.stage("sleep"):
+                            time.sleep(1) 
+                        # Sleep ke dauran model evict ho sakta hai: registry.run naye loader par ek baar dobara bhejta hai
+                        probs = model_registry.run(crop, model_loader, lambda l: predict_probs(
+                            l.model, l.processor, [model_image], l.device, timer=timer, service=l.service))[0].numpy()
+                        prediction_cache.put(cache_key, probs)
+                        if vectors is not None:
+                            with timer.stage("index_add"):
+                                embedding_index.add(vectors[0], probs, preview_image)
+                except SERVER_BUSY:
+                    st.error(BUSY_MESSAGE)
+                    st.stop()
+
+                # Gate se neeche: flips / crops / roshni ke variations, ek hi batched forward pass
+                source = "cache" if from_cache else "similar" if from_similar else "model"
+                tta_variants = 0
+                if use_tta and max(probs) * 100 < CONFIDENCE_THRESHOLD:
+                    with timer.stage("tta"):
+                        from tta import VARIANTS, budget_variants, tta_probs
+                        service_p50 = model_loader.service.stats()["compute_ms"]["p50"] / 1000 if model_loader.service else 0
+                        max_variants = min(TTA_VARIANTS, len(VARIANTS))
+                        tta_variants = budget_variants(TTA_BUDGET_MS / 1000, timer.stages.get("forward") or service_p50,
+                                                       max_variants)
+                        # Key mein variations ka set: budget ki wajah se adhoora TTA poore TTA ki jagah kabhi nahi.
+                        # Pehle se bana utna ya us se poora result ho to wahi
+                        tta_keys = {n: f"{cache_key}-tta{n}-{'+'.join(VARIANTS[:n])}"
+                                    for n in range(tta_variants, max_variants + 1)}
+                        tta_result = None
+                        for n in sorted(tta_keys, reverse=True):
+                            tta_result = prediction_cache.get(tta_keys[n])
+                            if tta_result is not None:
+                                tta_variants = n
+                                break
+                        if tta_result is None:
+                            try:
+                                tta_result = model_registry.run(crop, model_loader, lambda l: tta_probs(
+                                    l.model, l.processor, model_image, l.device, tta_variants, service=l.service))
+                                prediction_cache.put(tta_keys[tta_variants], tta_result)
+                            except SERVER_BUSY:
+                                # Pehla jawab mil chuka hai: variations ke baghair wahi dikhao
+                                st.error(f"{BUSY_MESSAGE} Variations (TTA) nahi chal sakin, neeche pehla jawab hai.")
+                    if tta_result is not None:
+                        probs, source = tta_result, "tta"
+
+                timer.begin("render")
+                probs = probs.tolist()
+                idx = max(range(len(probs)), key=probs.__getitem__)
+                conf = probs[idx] * 100
+                label = pretty_label(model, idx)
+                labels = [pretty_label(model, i) for i in range(len(probs))]
+                prob_dict = {l: p*100 for l, p in zip(labels, probs)}
                 
-                if conf < 90:
+                if conf < CONFIDENCE_THRESHOLD:
                     st.error("⚠️ **Photo Clear Nahi Hai!**")
-                    st.warning(f"Confidence: {conf:.1f}% (Low)\n\nYe Aloo ka patta nahi lag raha. Saaf photo upload karein.")
+                    st.warning(f"Confidence: {conf:.1f}% (Low)\n\nYe {crop_name} ka patta nahi lag raha. Saaf photo upload karein.")
+                    if source == "tta":
+                        st.caption("🔁 Variations (flip/crop/roshni) se bhi confidence nahi bani.")
+                    finish_timing(timer)
+                    record_diagnosis(crop, cache_key, probs, labels, model_rev, source, dict(timer.stages))
                     st.stop()
 
             is_healthy = "healthy" in label.lower() or "healty" in label.lower()
@@ -391,11 +761,30 @@ elif nav == "🥔 Potato (Aloo)":
                 <h4 style='color: {border_color}; margin-top: 10px; font-weight: 600;'>Confidence: {conf:.1f}%</h4>
             </div>
             """, unsafe_allow_html=True)
+            if from_cache:
+                st.caption("⚡ Ye photo pehle check ho chuki hai — result cache se aaya.")
+            elif source == "tta":
+                st.caption(f"🔁 Photo thori unclear thi — {tta_variants} variations (flip/crop/roshni) ke average se jawab mila.")
+            elif from_similar:
+                st.caption(f"🔁 Milti julti photo pehle check ho chuki hai (similarity {similar[0]['similarity']:.3f}) — wahi result.")
             
             st.write("### 📊 Analysis Breakdown")
             for l, p in prob_dict.items():
                 st.write(f"**{l}**")
                 st.progress(int(p))
+
+            if similar:
+                with st.expander(f"🖼️ Milte Julte Purane Cases ({len(similar)})"):
+                    for case in similar:
+                        case_idx = int(case["probs"].argmax())
+                        thumb_col, text_col = st.columns([1, 3])
+                        thumb = embedding_index.thumbnail_path(case["id"])
+                        if os.path.exists(thumb):
+                            thumb_col.image(thumb)
+                        text_col.markdown(f"**{labels[case_idx]}** · {case['probs'][case_idx] * 100:.1f}%  \n"
+                                          f"Similarity {case['similarity']:.3f} · "
+                                          f"{datetime.datetime.fromtimestamp(case['time']):%d %b %Y}")
+                    st.caption(f"Index: {embedding_index.count} photos")
             
             report_text = f"Plant Doctor AI Report\nDate: {datetime.datetime.now()}\n\nDiagnosis: {label}\nConfidence: {conf:.1f}%\n\nStatus: {'Healthy' if is_healthy else 'Action Needed'}"
             st.download_button(
@@ -439,6 +828,52 @@ elif nav == "🥔 Potato (Aloo)":
                     </ul>
                 </div>
                 """, unsafe_allow_html=True)
+            finish_timing(timer)
+            record_diagnosis(crop, cache_key, probs, labels, model_rev, source, dict(timer.stages))
+
+elif nav == "📊 Dashboard":
+    # Sab numbers daily_rollup se (har write ke saath update), poori history scan nahi hoti
+    st.markdown("<h2 style='color: #064e3b; font-weight: 800;'>📊 Diagnosis Dashboard</h2>", unsafe_allow_html=True)
+    if history_store is None:
+        st.info("History band hai (PLANT_DOCTOR_HISTORY_DB khali).")
+        st.stop()
+    col1, col2 = st.columns(2)
+    days = col1.selectbox("Period", [7, 30, 90, 365], index=1, format_func=lambda d: f"Last {d} days")
+    crop_filter = col2.selectbox("Crop", ["All"] + history_store.crops(), format_func=str.title)
+    crop_filter = None if crop_filter == "All" else crop_filter
+    since = day_of(time.time() - (days - 1) * 86400)
+    daily = history_store.daily(since, crop_filter)
+    per_label = history_store.by_label(since, crop_filter)
+
+    total = sum(count for _, count, _ in daily)
+    rejected = sum(r for _, _, r in daily)
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Diagnoses", f"{total:,}")
+    m2.metric("Rejection Rate", f"{rejected / total:.1%}" if total else "-")
+    m3.metric("Avg Confidence", f"{sum(c * n for _, n, _, c in per_label) / total:.1f}%" if total else "-")
+    if not total:
+        st.info("Is period mein abhi koi diagnosis nahi.")
+        st.stop()
+
+    st.write("### 📅 Per Day")
+    st.bar_chart({"day": [d for d, _, _ in daily], "accepted": [n - r for _, n, r in daily],
+                  "rejected": [r for _, _, r in daily]}, x="day", y=["accepted", "rejected"])
+    st.write("### 🏷️ Per Label")
+    st.dataframe([{"label": label, "count": n, "rejected": r, "rejection rate": f"{r / n:.1%}",
+                   "avg confidence": round(c, 1)} for label, n, r, c in per_label], use_container_width=True)
+
+    # Export sirf click par banta hai: rows cursor se temp file mein stream, memory mein poori history nahi
+    def export_history():
+        import tempfile
+        fh = tempfile.TemporaryFile("w+b")
+        text = io.TextIOWrapper(fh, encoding="utf-8", newline="")
+        history_store.write_csv(text, since, crop_filter)
+        text.flush()
+        text.detach()
+        fh.seek(0)
+        return fh
+
+    st.download_button("📥 Export CSV", export_history, file_name=f"plant_doctor_history_{days}d.csv", mime="text/csv")
 
 elif nav in ["🍅 Tomato Check", "🌽 Corn Field"]:
     st.info("🚧 Coming Soon...") 
\ No newline at end of file
@@ -0,0 +1,103 @@
+# --- CASCADE: pehle sasta pass (kam resolution / kam layers), shak ho to hi poora ViT ---
+import threading
+import time
+import types
+
+import torch
+import torch.nn.functional as F
+
+CHEAP_SIZE = 112  # 224 ke muqable 4x kam patches (49 vs 196)
+
+
+def supports_cascade(model):
+    # Sirf eager HF ViT: compiled graph mein beech ki layers tak pohanch nahi
+    return hasattr(model, "vit") and hasattr(model, "classifier")
+
+
+def _blocks(vit):
+    return vit.layers if hasattr(vit, "layers") else vit.encoder.layer
+
+
+def cheap_features(model, pixel_values, size=CHEAP_SIZE, layers=0):
+    # Usi checkpoint ka chhota pass: pixel_values ko size x size par, aur pehli `layers` encoder layers (0 = sab)
+    # Returns CLS token (final layernorm ke baad), jo classifier head ka input hai
+    vit = model.vit
+    if size and size != pixel_values.shape[-1]:
+        pixel_values = F.interpolate(pixel_values.float(), size=(size, size), mode="bilinear",
+                                     align_corners=False, antialias=True).to(pixel_values.dtype)
+    hidden = vit.embeddings(pixel_values, interpolate_pos_encoding=True)
+    blocks = _blocks(vit)
+    for block in blocks[:layers or len(blocks)]:
+        hidden = block(hidden)
+        hidden = hidden[0] if isinstance(hidden, tuple) else hidden
+    return vit.layernorm(hidden)[:, 0]
+
+
+def cheap_logits(model, pixel_values, size=CHEAP_SIZE, layers=0):
+    return model.classifier(cheap_features(model, pixel_values, size, layers))
+
+
+def early_exit_mask(probs, threshold, margin=0.0):
+    # threshold / margin percent mein (CONFIDENCE_THRESHOLD jaisa); True = sasta jawab kaafi hai
+    top = probs.topk(min(2, probs.shape[-1]), dim=-1).values
+    second = top[:, 1] if top.shape[-1] > 1 else torch.zeros_like(top[:, 0])
+    return (top[:, 0] * 100 >= threshold) & ((top[:, 0] - second) * 100 >= margin)
+
+
+class CascadeClassifier:
+    # HF model jaisa chehra: model(pixel_values=...).logits; har row ya sasti ya poori model ki logits
+    backend = "cascade"
+
+    def __init__(self, model, size=CHEAP_SIZE, layers=0, threshold=95, margin=0):
+        self.model = model
+        self.module = model  # resident_bytes() ke liye
+        self.config = model.config
+        self.dtype = model.dtype
+        self.size = size
+        self.layers = layers
+        self.threshold = threshold
+        self.margin = margin
+        self.early = 0
+        self.escalated = 0
+        self.cheap_s = 0.0
+        self.full_s = 0.0
+        self._lock = threading.Lock()
+
+    def eval(self):
+        self.model.eval()
+        return self
+
+    def __call__(self, pixel_values, **_):
+        with torch.no_grad():
+            start = time.perf_counter()
+            logits = cheap_logits(self.model, pixel_values, self.size, self.layers)
+            accept = early_exit_mask(torch.softmax(logits.float(), dim=-1), self.threshold, self.margin)
+            cheap_done = time.perf_counter()
+            escalate = (~accept).nonzero().flatten()
+            if len(escalate):
+                rows = pixel_values if len(escalate) == len(accept) else pixel_values[escalate]
+                logits = logits.clone()
+                logits[escalate] = self.model(pixel_values=rows).logits.to(logits.dtype)
+            finished = time.perf_counter()
+        with self._lock:
+            self.early += int(accept.sum())
+            self.escalated += len(escalate)
+            self.cheap_s += cheap_done - start
+            self.full_s += finished - cheap_done
+        return types.SimpleNamespace(logits=logits, early=accept)
+
+    def stats(self):
+        with self._lock:
+            total = self.early + self.escalated
+            return {"early": self.early, "escalated": self.escalated,
+                    "early_rate": self.early / total if total else 0.0,
+                    "cheap_s": self.cheap_s, "full_s": self.full_s}
+
+
+def embedding_features(model, pixel_values, size=CHEAP_SIZE):
+    # Embedding index ka vector: sasta (size px) pass ka CLS, poore forward se pehle lookup ke liye.
+    # Compiled graph mein beech ka CLS nahi milta: wahan None (index band)
+    base = model.model if isinstance(model, CascadeClassifier) else model
+    if not supports_cascade(base):
+        return None
+    return cheap_features(base, pixel_values, size)
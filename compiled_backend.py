@@ -0,0 +1,117 @@
+# --- COMPILED BACKEND: TorchScript graph disk par cache, warna eager fallback ---
+import glob
+import hashlib
+import json
+import os
+import types
+
+import torch
+
+ARTIFACT_DIR = "compiled"
+DEFAULT_ATOL = 1e-3
+
+
+def weights_fingerprint(model_path):
+    digest = hashlib.sha256()
+    for name in ("config.json", "model.safetensors"):
+        path = os.path.join(model_path, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(4 * 1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def artifact_path(model_path, precision):
+    # torch version ya weights badlen to naya naam: purana artifact khud hi "stale"
+    torch_tag = torch.__version__.replace("+", "_")
+    key = f"vit-{precision}-torch{torch_tag}-{weights_fingerprint(model_path)}"
+    return os.path.join(model_path, ARTIFACT_DIR, key + ".pt")
+
+
+class _LogitsOnly(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model(pixel_values=pixel_values).logits
+
+
+class CompiledClassifier:
+    # HF model jaisa chehra: model(pixel_values=...).logits, .config, .dtype
+    backend = "compiled"
+
+    def __init__(self, module, config, dtype):
+        self.module = module
+        self.config = config
+        self.dtype = dtype
+
+    def __call__(self, pixel_values, **_):
+        return types.SimpleNamespace(logits=self.module(pixel_values))
+
+    def eval(self):
+        return self
+
+
+def _example(model, device, batch=1, size=224):
+    generator = torch.Generator().manual_seed(0)
+    pixels = torch.rand(batch, 3, size, size, generator=generator) * 2 - 1
+    return pixels.to(device=device, dtype=model.dtype)
+
+
+def export(model, path, device, precision):
+    model.config.return_dict = True
+    with torch.no_grad():
+        traced = torch.jit.trace(_LogitsOnly(model).eval(), _example(model, device), check_trace=False)
+        traced = torch.jit.freeze(traced)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    torch.jit.save(traced, tmp)
+    os.replace(tmp, path)
+    with open(path + ".json", "w") as f:
+        json.dump({"torch": torch.__version__, "dtype": str(model.dtype)}, f)
+    # Isi precision ke purane (stale) artifacts hata do
+    for old in glob.glob(os.path.join(os.path.dirname(path), f"vit-{precision}-*.pt*")):
+        if not old.startswith(path):
+            os.remove(old)
+
+
+def max_logit_diff(eager, compiled, device):
+    # Batch 1 aur 3 dono: trace ne batch size hard-code to nahi kiya
+    worst = 0.0
+    with torch.no_grad():
+        for batch in (1, 3):
+            pixels = _example(eager, device, batch)
+            expected = eager(pixel_values=pixels).logits.float()
+            actual = compiled(pixel_values=pixels).logits.float()
+            if actual.shape != expected.shape:
+                return float("inf")
+            worst = max(worst, (actual - expected).abs().max().item())
+    return worst
+
+
+def load_compiled(model, model_path, precision, device, atol=DEFAULT_ATOL):
+    # Returns compiled wrapper, ya koi bhi masla ho to wahi eager model
+    try:
+        path = artifact_path(model_path, precision)
+        if not os.path.exists(path):
+            print(f"Compiling model to {path} ...")
+            export(model, path, device, precision)
+        compiled = CompiledClassifier(torch.jit.load(path, map_location=device), model.config, model.dtype)
+        diff = max_logit_diff(model, compiled, device)
+        if diff > atol:
+            print(f"Compiled model differs from eager by {diff:.2e} (> {atol:.0e}), using eager")
+            return model
+        return compiled
+    except Exception as e:
+        print(f"Compiled backend unavailable ({e}), using eager")
+        return model
+
+
+def warm_up(model, device, runs=2):
+    # Pehli request ka lazy init / JIT profiling yahin ho jaye
+    with torch.no_grad():
+        for _ in range(runs):
+            model(pixel_values=_example(model, device))
@@ -0,0 +1,172 @@
+# --- EMBEDDING INDEX: ViT CLS vectors (float16, memory-mapped), milti julti photo ka purana jawab ---
+# torch import NAHI: vectors sasta CLS pass deta hai (inference.embed_images / InferenceService.embed)
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+HEADER = "index.json"
+MODES = ("auto", "exact", "lsh")
+APPROX_AFTER = 100_000  # "auto" mode: is se zyada entries par LSH
+LSH_BITS = 64  # ek uint64 signature
+LSH_CANDIDATES = 2048  # LSH ke baad itne vectors par exact cosine
+CHUNK_ROWS = 16384  # memmap se ek waqt mein itni rows float32 mein (768 dim par ~50 MB)
+START_CAPACITY = 1024
+THUMB_SIDE = 160
+
+
+def normalize(features):
+    # CLS features (N, dim) -> L2-normalized float32; compiled backend (features None) par None
+    if features is None:
+        return None
+    vectors = np.asarray(features, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    def _popcount(codes):
+        # numpy < 2.0: uint64 ke 8 bytes unpack kar ke gino
+        return np.unpackbits(codes.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1, dtype=np.uint8)
+
+
+class EmbeddingIndex:
+    # Files: vectors.f16 (N, dim), probs.f16 (N, labels), codes.u64 (LSH signatures), times.f64
+    def __init__(self, path, dim, num_labels, mode="auto", approx_after=APPROX_AFTER):
+        if mode not in MODES:
+            raise ValueError(f"Unknown index mode {mode!r}, expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.approx_after = approx_after
+        os.makedirs(os.path.join(path, "thumbs"), exist_ok=True)
+        header = os.path.join(path, HEADER)
+        if os.path.exists(header):
+            with open(header) as f:
+                meta = json.load(f)
+            if (meta["dim"], meta["num_labels"]) != (dim, num_labels):
+                raise ValueError(f"Index at {path} has dim/labels {meta['dim']}/{meta['num_labels']}, "
+                                 f"expected {dim}/{num_labels}")
+        else:
+            meta = {"dim": dim, "num_labels": num_labels, "count": 0, "capacity": START_CAPACITY,
+                    "bits": LSH_BITS, "seed": 0}
+        self.dim, self.num_labels = dim, num_labels
+        self.count, self.capacity, self.bits, self.seed = meta["count"], meta["capacity"], meta["bits"], meta["seed"]
+        # Random hyperplanes (seed header mein, taake har restart par wahi signatures)
+        self.planes = np.random.default_rng(self.seed).standard_normal((self.bits, dim)).astype(np.float32)
+        self.reuses = 0
+        self._lock = threading.RLock()
+        self._open()
+        self._write_header()
+
+    def _map(self, name, dtype, row_shape):
+        filename = os.path.join(self.path, name)
+        size = self.capacity * int(np.prod(row_shape)) * np.dtype(dtype).itemsize
+        with open(filename, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)  # sparse file: khali rows disk par jagah nahi leti
+        return np.memmap(filename, dtype=dtype, mode="r+", shape=(self.capacity, *row_shape))
+
+    def _open(self):
+        self.vectors = self._map("vectors.f16", np.float16, (self.dim,))
+        self.probs = self._map("probs.f16", np.float16, (self.num_labels,))
+        self.codes = self._map("codes.u64", np.uint64, ())
+        self.times = self._map("times.f64", np.float64, ())
+
+    def _write_header(self):
+        meta = {"dim": self.dim, "num_labels": self.num_labels, "count": self.count, "capacity": self.capacity,
+                "bits": self.bits, "seed": self.seed}
+        tmp = os.path.join(self.path, HEADER + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, HEADER))
+
+    def signatures(self, vectors):
+        bits = np.asarray(vectors, dtype=np.float32) @ self.planes.T > 0
+        return np.packbits(bits, axis=-1, bitorder="little").view(np.uint64).ravel()
+
+    def add(self, vector, probs, thumbnail=None):
+        # Returns naya id; pehle rows, phir header (crash ho to adhi entry count mein nahi aati)
+        with self._lock:
+            if self.count == self.capacity:
+                for array in (self.vectors, self.probs, self.codes, self.times):
+                    array.flush()
+                self.capacity *= 2
+                self._open()
+            i = self.count
+            self.vectors[i] = vector
+            self.probs[i] = probs
+            self.codes[i] = self.signatures(vector[None])[0]
+            self.times[i] = time.time()
+            if thumbnail is not None:
+                thumb = thumbnail.copy()
+                thumb.thumbnail((THUMB_SIDE, THUMB_SIDE))
+                thumb.convert("RGB").save(self.thumbnail_path(i), "JPEG", quality=80)
+            for array in (self.vectors, self.probs, self.codes, self.times):
+                array.flush()
+            self.count += 1
+            self._write_header()
+            return i
+
+    def extend(self, vectors, probs):
+        # Bulk import (tools / purani history): ek baar grow, ek flush
+        with self._lock:
+            n = len(vectors)
+            while self.count + n > self.capacity:
+                self.capacity *= 2
+            self._open()
+            rows = slice(self.count, self.count + n)
+            self.vectors[rows] = vectors
+            self.probs[rows] = probs
+            self.codes[rows] = self.signatures(vectors)
+            self.times[rows] = time.time()
+            for array in (self.vectors, self.probs, self.codes, self.times):
+                array.flush()
+            self.count += n
+            self._write_header()
+
+    def _exact(self, query, ids=None):
+        # Chunks mein float32 dot product: poora index kabhi RAM mein nahi
+        if ids is not None:
+            return ids, self.vectors[ids].astype(np.float32) @ query
+        sims = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, self.count)
+            sims[start:stop] = self.vectors[start:stop].astype(np.float32) @ query
+        return np.arange(self.count), sims
+
+    def _lsh_candidates(self, query):
+        code = self.signatures(query[None])[0]
+        distance = np.empty(self.count, dtype=np.uint8)
+        for start in range(0, self.count, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, self.count)
+            distance[start:stop] = _popcount(self.codes[start:stop] ^ code)
+        keep = min(LSH_CANDIDATES, self.count)
+        return np.sort(np.argpartition(distance, keep - 1)[:keep])  # sorted: memmap reads aage ki taraf
+
+    def search(self, vector, k=5, mode=None):
+        # Returns [{id, similarity, probs, time}], sab se milta julta pehle
+        query = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock:
+            if not self.count:
+                return []
+            mode = mode or self.mode
+            if mode == "auto":
+                mode = "lsh" if self.count > self.approx_after else "exact"
+            ids = self._lsh_candidates(query) if mode == "lsh" else None
+            ids, sims = self._exact(query, ids)
+            top = np.argpartition(-sims, min(k, len(sims)) - 1)[:k]
+            top = top[np.argsort(-sims[top])]
+            return [{"id": int(ids[j]), "similarity": float(sims[j]),
+                     "probs": self.probs[ids[j]].astype(np.float32), "time": float(self.times[ids[j]])}
+                    for j in top]
+
+    def thumbnail_path(self, i):
+        return os.path.join(self.path, "thumbs", f"{i}.jpg")
+
+    def stats(self):
+        with self._lock:
+            return {"entries": self.count, "capacity": self.capacity, "reuses": self.reuses,
+                    "disk_bytes": self.count * (self.dim + self.num_labels) * 2 + self.count * 16}
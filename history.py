@@ -0,0 +1,190 @@
+# --- DIAGNOSIS HISTORY: SQLite (append-only), background writer, roz ke rollups saath saath ---
+# torch import NAHI: Dashboard page model ke baghair chalta hai
+import csv
+import io
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS diagnoses (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    crop TEXT NOT NULL,
+    image_hash TEXT NOT NULL,
+    label TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    accepted INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    revision TEXT NOT NULL,
+    probs BLOB NOT NULL,
+    stages TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS diagnoses_day ON diagnoses (day);
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day TEXT NOT NULL,
+    crop TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    rejected INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (day, crop, label)
+) WITHOUT ROWID;
+"""
+COLUMNS = ("id", "ts", "day", "crop", "image_hash", "label", "confidence", "accepted", "source", "revision",
+           "probs", "stages")
+UPSERT = """
+INSERT INTO daily_rollup (day, crop, label, count, rejected, confidence_sum) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, crop, label) DO UPDATE SET count = count + excluded.count,
+    rejected = rejected + excluded.rejected, confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+
+
+def day_of(ts):
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # readers (dashboard) writer ko nahi rokte
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class HistoryStore:
+    def __init__(self, path, batch_size=200, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        with _connect(path) as conn:
+            conn.executescript(SCHEMA)
+        conn.close()
+        self._queue = queue.Queue()
+        self.written = 0
+        self.failures = 0
+        threading.Thread(target=self._run, name="history-writer", daemon=True).start()
+
+    def record(self, crop, image_hash, probs, label, confidence, accepted, source, revision, stages=None, ts=None):
+        # Request path par sirf queue.put; disk par likhna writer thread ka kaam
+        ts = time.time() if ts is None else ts
+        self._queue.put((ts, day_of(ts), crop, image_hash, label, float(confidence), int(bool(accepted)), source,
+                         revision, np.asarray(probs, dtype=np.float32).tobytes(), json.dumps(stages or {})))
+
+    def _run(self):
+        conn = _connect(self.path)
+        while True:
+            rows = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    rows.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(conn, rows)
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                print(f"History write failed ({len(rows)} rows dropped): {e}")
+                self.failures += len(rows)
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def _write(self, conn, rows):
+        # Ek transaction: rows + unke rollups, dono ya koi bhi nahi
+        rollup = defaultdict(lambda: [0, 0, 0.0])
+        for ts, day, crop, _, label, confidence, accepted, *_ in rows:
+            agg = rollup[(day, crop, label)]
+            agg[0] += 1
+            agg[1] += 1 - accepted
+            agg[2] += confidence
+        with conn:
+            conn.executemany(f"INSERT INTO diagnoses ({', '.join(COLUMNS[1:])}) VALUES "
+                             f"({', '.join('?' * (len(COLUMNS) - 1))})", rows)
+            conn.executemany(UPSERT, [(*key, *agg) for key, agg in rollup.items()])
+
+    def flush(self):
+        # Tools/tests ke liye: queue mein pari har row likhi jaye
+        self._queue.join()
+
+    def _read(self, sql, params=()):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _where(self, since_day, crop):
+        clauses, params = ["day >= ?"], [since_day]
+        if crop:
+            clauses.append("crop = ?")
+            params.append(crop)
+        return " AND ".join(clauses), params
+
+    def daily(self, since_day, crop=None):
+        # [(day, count, rejected)] — rollup se, diagnoses table scan nahi
+        where, params = self._where(since_day, crop)
+        return self._read(f"SELECT day, SUM(count), SUM(rejected) FROM daily_rollup WHERE {where} "
+                          "GROUP BY day ORDER BY day", params)
+
+    def by_label(self, since_day, crop=None):
+        # [(label, count, rejected, avg confidence)]
+        where, params = self._where(since_day, crop)
+        return self._read(f"SELECT label, SUM(count), SUM(rejected), SUM(confidence_sum) / SUM(count) "
+                          f"FROM daily_rollup WHERE {where} GROUP BY label ORDER BY SUM(count) DESC", params)
+
+    def crops(self):
+        return [row[0] for row in self._read("SELECT DISTINCT crop FROM daily_rollup ORDER BY crop")]
+
+    def iter_rows(self, since_day="", crop=None, chunk=5000):
+        # Cursor se chunk chunk: poori history kabhi memory mein nahi
+        where, params = self._where(since_day, crop)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM diagnoses WHERE {where} ORDER BY id", params)
+            while True:
+                rows = cursor.fetchmany(chunk)
+                if not rows:
+                    return
+                for row in rows:
+                    row = dict(zip(COLUMNS, row))
+                    row["probs"] = np.frombuffer(row["probs"], dtype=np.float32).astype(np.float64).round(6).tolist()
+                    yield row
+        finally:
+            conn.close()
+
+    def iter_csv(self, since_day="", crop=None, rows_per_chunk=5000):
+        # Text chunks (HTTP streaming / download ke liye)
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=COLUMNS)
+        writer.writeheader()
+        for n, row in enumerate(self.iter_rows(since_day, crop), 1):
+            row["probs"] = json.dumps(row["probs"])
+            writer.writerow(row)
+            if n % rows_per_chunk == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+
+    def write_csv(self, fh, since_day="", crop=None):
+        for chunk in self.iter_csv(since_day, crop):
+            fh.write(chunk)
+
+    def rebuild_rollups(self):
+        # Sirf maintenance: rollup ko poori table se dobara banao (normal path incremental hai)
+        conn = _connect(self.path)
+        try:
+            with conn:
+                conn.execute("DELETE FROM daily_rollup")
+                conn.execute("INSERT INTO daily_rollup SELECT day, crop, label, COUNT(*), SUM(1 - accepted), "
+                             "SUM(confidence) FROM diagnoses GROUP BY day, crop, label")
+        finally:
+            conn.close()
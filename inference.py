@@ -0,0 +1,174 @@
+# --- SHARED INFERENCE HELPERS (app.py + tools/) ---
+import os
+import warnings
+import zipfile
+from contextlib import nullcontext
+
+import torch
+from transformers import AutoConfig, AutoModelForImageClassification
+
+import compiled_backend
+from cascade import CascadeClassifier, embedding_features, supports_cascade
+from preprocessing import Preprocessor
+# Tools PRECISIONS / BACKENDS / MODEL_PATH yahin (inference) se import karte hain
+from settings import BACKENDS, CONFIDENCE_THRESHOLD, MODEL_PATH, PRECISIONS  # noqa: F401
+
+IMAGE_TYPES = ["jpg", "png", "jpeg", "webp", "jfif"]
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+
+def is_lfs_pointer(path):
+    # Git LFS checkout na hua ho to safetensors sirf ek chhota text pointer hota hai
+    try:
+        with open(path, "rb") as f:
+            return f.read(64).startswith(b"version https://git-lfs")
+    except OSError:
+        return False
+
+
+def bf16_supported():
+    try:
+        return torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def apply_precision(model, precision, device=None):
+    # Returns (model, precision jo asal mein lagi) — CPU support na ho to fp32 hi rehta hai
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+    device = device or next(model.parameters()).device
+    if precision == "int8":
+        if device.type != "cpu":
+            print(f"Precision int8 is CPU-only, staying on fp32 for {device}")
+            return model, "fp32"
+        with warnings.catch_warnings():
+            # torch.ao dynamic quantization deprecation notices, behaviour same hai
+            warnings.simplefilter("ignore")
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model.eval(), "int8"
+    if precision == "bf16":
+        if device.type == "cpu" and not bf16_supported():
+            print("bfloat16 not supported on this CPU, staying on fp32")
+            return model, "fp32"
+        return model.to(torch.bfloat16).eval(), "bf16"
+    return model, "fp32"
+
+
+def load_classifier(model_path=MODEL_PATH, device=None, allow_random_init=False, precision="fp32",
+                    backend="eager", warm_up=False, cascade=None):
+    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    weights = os.path.join(model_path, "model.safetensors")
+    if allow_random_init and is_lfs_pointer(weights):
+        # Benchmarks/tools ke liye: same architecture, random (lekin har baar same) weights
+        config = AutoConfig.from_pretrained(model_path)
+        # HF ka weight init global RNG se chalta hai (generator pass nahi hota): seed sirf forked RNG par,
+        # taake process ke baqi torch random numbers par asar na ho
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(0)
+            model = AutoModelForImageClassification.from_config(config)
+    else:
+        # safetensors memory-mapped, aur weights seedha apni jagah (float32 ki doosri copy nahi)
+        model = AutoModelForImageClassification.from_pretrained(model_path, low_cpu_mem_usage=True)
+    processor = Preprocessor.from_pretrained(model_path)
+    model.to(device).eval()
+    model, precision = apply_precision(model, precision, device)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "compiled":
+        model = compiled_backend.load_compiled(model, model_path, precision, device)
+    if cascade is not None:
+        # cascade = CascadeClassifier ke options (size, layers, threshold, margin)
+        if supports_cascade(model):
+            model = CascadeClassifier(model, **cascade)
+        else:
+            print(f"Cascade needs the eager backend, serving the full model only ({backend})")
+    if warm_up:
+        compiled_backend.warm_up(model, device)
+    return model, processor, device
+
+
+def pretty_label(model, idx):
+    return model.config.id2label[idx].replace("_", " ").title()
+
+
+def predict_probs(model, processor, images, device, timer=None, service=None):
+    # Ek hi forward pass mein poora batch: (N, num_labels) probabilities
+    stage = timer.stage if timer is not None else (lambda name: nullcontext())
+    if service is not None:
+        # Shared worker pool: doosre sessions ki requests ke saath micro-batch (buffer result tak hamara hi hai)
+        with stage("preprocess"):
+            pixel_values = processor(images=images, return_tensors="pt")["pixel_values"]
+        probs, timings = service.infer(pixel_values)
+        if timer is not None:
+            timer.stages.update(timings)
+        return probs
+    with stage("preprocess"):
+        pixel_values = processor(images=images, return_tensors="pt")["pixel_values"].to(device, model.dtype)
+    with stage("forward"), torch.no_grad():
+        logits = model(pixel_values=pixel_values).logits
+    with stage("softmax"):
+        return torch.softmax(logits.float(), dim=-1).cpu()
+
+
+def embed_images(model, processor, images, device, timer=None, service=None):
+    # Embedding index ke liye sasta CLS pass: (N, hidden) float32, compiled backend par None
+    if service is not None:
+        pixel_values = processor(images=images, return_tensors="pt")["pixel_values"]
+        features, timings = service.embed(pixel_values)
+        if timer is not None:
+            timer.stages.update({f"embed_{name}": seconds for name, seconds in timings.items()})
+        return features
+    stage = timer.stage if timer is not None else (lambda name: nullcontext())
+    with stage("embed_forward"), torch.no_grad():
+        pixel_values = processor(images=images, return_tensors="pt")["pixel_values"].to(device, model.dtype)
+        features = embedding_features(model, pixel_values)
+    return features.float().cpu() if features is not None else None
+
+
+def iter_batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _is_image_name(name):
+    return name.rsplit(".", 1)[-1].lower() in IMAGE_TYPES
+
+
+def count_uploads(files):
+    total = 0
+    for f in files:
+        if f.name.lower().endswith(".zip"):
+            f.seek(0)
+            with zipfile.ZipFile(f) as zf:
+                total += sum(1 for i in zf.infolist() if not i.is_dir() and _is_image_name(i.filename))
+        else:
+            total += 1
+    return total
+
+
+def expand_uploads(files):
+    # Uploaded files aur zip ke andar ki images ko (name, bytes) ki shakal mein ek ek kar ke dena
+    for f in files:
+        if f.name.lower().endswith(".zip"):
+            f.seek(0)
+            with zipfile.ZipFile(f) as zf:
+                for info in zf.infolist():
+                    if info.is_dir() or not _is_image_name(info.filename):
+                        continue
+                    if info.file_size > MAX_UPLOAD_BYTES:
+                        yield info.filename, None
+                        continue
+                    # Header ka size jhoot bhi ho sakta hai (zip bomb): limit se zyada kabhi decompress nahi
+                    with zf.open(info) as member:
+                        data = member.read(MAX_UPLOAD_BYTES + 1)
+                    yield info.filename, (data if len(data) <= MAX_UPLOAD_BYTES else None)
+        else:
+            f.seek(0)
+            yield f.name, (f.read() if f.size <= MAX_UPLOAD_BYTES else None)
@@ -0,0 +1,187 @@
+# --- INFERENCE SERVICE: saare sessions ki requests ek queue mein, micro-batches mein forward pass ---
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import torch
+
+from cascade import embedding_features
+
+
+class ServiceClosed(RuntimeError):
+    # Model registry se evict ho chuka: caller naya loader le kar dobara koshish kare
+    pass
+
+
+class _Request:
+    __slots__ = ("pixel_values", "kind", "future", "enqueued_at")
+
+    def __init__(self, pixel_values, kind):
+        self.pixel_values = pixel_values
+        self.kind = kind  # "classify" (probs) ya "embed" (embedding index ka CLS vector)
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+class InferenceService:
+    def __init__(self, model, device, workers=1, max_batch=8, max_wait_ms=10, pin_cores=False, timeout=60):
+        self.model = model
+        self.device = device
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.wait_s = deque(maxlen=1000)
+        self.compute_s = deque(maxlen=1000)
+        self.requests = 0
+
+        # Cores workers mein baant do: har worker ke intra-op threads apne cores par
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        self.workers = max(1, min(workers, len(cores)))
+        per_worker = max(1, len(cores) // self.workers)
+        torch.set_num_threads(per_worker)
+        self._threads = []
+        for i in range(self.workers):
+            worker_cores = cores[i * per_worker:(i + 1) * per_worker] if pin_cores else None
+            t = threading.Thread(target=self._run, args=(worker_cores,), name=f"inference-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, pixel_values, kind="classify"):
+        # pixel_values: (N, 3, H, W); Future ka result (N, num_labels) probabilities, ya "embed" par (N, hidden)
+        # CLS vectors (compiled backend par None).
+        # Lock ke andar: close() ke baad koi request queue mein nahi pohanchti (warna koi worker use na uthata)
+        with self._lock:
+            if self._closed:
+                raise ServiceClosed("InferenceService is closed")
+            request = _Request(pixel_values, kind)
+            self._queue.put(request)
+        return request.future
+
+    def _wait(self, future):
+        # Timeout ke saath (session kabhi hamesha ke liye na atke); returns (result, timings)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"Inference did not finish within {self.timeout:g}s") from None
+        return result, future.timings
+
+    def infer(self, pixel_values):
+        # submit + intezar; returns (probs, timings)
+        return self._wait(self.submit(pixel_values))
+
+    def embed(self, pixel_values):
+        # Embedding index ka sasta CLS pass, usi queue / workers se; returns (features ya None, timings)
+        return self._wait(self.submit(pixel_values, "embed"))
+
+    def _forward(self, kind, pixels):
+        with torch.no_grad():
+            if kind == "embed":
+                features = embedding_features(self.model, pixels)
+                return features.float().cpu() if features is not None else None
+            return torch.softmax(self.model(pixel_values=pixels).logits.float(), dim=-1).cpu()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch, rows = [first], first.pixel_values.shape[0]
+        # Pehli request ke baad max_wait tak aur requests ka intezar (deadline se zyada nahi)
+        deadline = first.enqueued_at + self.max_wait
+        while rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # doosre workers ko bhi band hone ka signal
+                break
+            batch.append(request)
+            rows += request.pixel_values.shape[0]
+        return batch
+
+    def _run(self, cores):
+        if cores and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)  # Linux: sirf is thread (aur iske OpenMP threads) ke liye
+        while True:
+            batch = self._collect()
+            if batch is None:
+                self._queue.put(None)
+                return
+            # Timeout par cancel ho chuki requests chhor do (un ka intezar karne wala koi nahi)
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            # Classify aur embed alag forward passes (ek micro-batch mein dono ho sakte hain)
+            for kind in ("classify", "embed"):
+                group = [r for r in batch if r.kind == kind]
+                if group:
+                    self._run_group(kind, group)
+
+    def _run_group(self, kind, batch):
+        started = time.perf_counter()
+        try:
+            pixels = torch.cat([r.pixel_values for r in batch]).to(self.device, self.model.dtype)
+            result = self._forward(kind, pixels)
+        except Exception as e:
+            for r in batch:
+                r.future.set_exception(e)
+            return
+        finished = time.perf_counter()
+        with self._lock:
+            self.batch_sizes[len(batch)] += 1
+            self.requests += len(batch)
+            if kind == "classify":
+                # TTA budget isi p50 se andaza lagata hai: sasta embed pass is mein nahi
+                self.compute_s.append(finished - started)
+            for r in batch:
+                self.wait_s.append(started - r.enqueued_at)
+        offset = 0
+        for r in batch:
+            n = r.pixel_values.shape[0]
+            r.future.timings = {"queue_wait": started - r.enqueued_at, "forward": finished - started}
+            r.future.set_result(result[offset:offset + n] if result is not None else None)
+            offset += n
+
+    def close(self, wait=False):
+        # Jo batch chal raha hai wo poora hota hai; queue mein pari baqi requests ServiceClosed ke saath fail
+        # (caller registry se naya loader le kar dobara bhejta hai), phir workers band
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None and request.future.set_running_or_notify_cancel():
+                    request.future.set_exception(ServiceClosed("InferenceService closed before this request ran"))
+            self._queue.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def stats(self):
+        with self._lock:
+            wait, compute = list(self.wait_s), list(self.compute_s)
+            batches = dict(sorted(self.batch_sizes.items()))
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "requests": self.requests,
+            "batch_sizes": batches,
+            "wait_ms": {"p50": _percentile(wait, 0.5) * 1000, "p95": _percentile(wait, 0.95) * 1000},
+            "compute_ms": {"p50": _percentile(compute, 0.5) * 1000, "p95": _percentile(compute, 0.95) * 1000},
+        }
@@ -0,0 +1,157 @@
+# --- UPLOAD INGESTION: pehle sirf header (format, pixels), phir decode memory budget ke andar ---
+# torch import NAHI: tools/ingest_stress bina model ke chalta hai
+import ctypes
+import ctypes.util
+import io
+import threading
+import warnings
+from contextlib import contextmanager
+
+from PIL import Image
+
+from settings import DECODE_BUDGET_MB, DECODE_TIMEOUT, MAX_IMAGE_PIXELS
+
+FORMATS = ("JPEG", "PNG", "WEBP")  # jpg / jpeg / jfif sab JPEG hain
+WEBP_COPIES = 4  # tools/ingest_stress se napa hua (12 MP WebP ~ 186 MB peak)
+DECODER_BYTES = 2 * 1024 * 1024  # decoder ke apne buffers (libjpeg / zlib / libwebp), har decode par; napa hua
+# glibc: is se bari allocation hamesha mmap (free hote hi OS ko wapas). Image buffers is se bare; torch ki batch-1
+# ViT allocations (~2 MB) chhoti, wo malloc arena mein hi rehti hain (1 MB par forward ~5% dheema napa)
+MMAP_THRESHOLD = 4 * 1024 * 1024
+M_TRIM_THRESHOLD, M_MMAP_THRESHOLD = -1, -3
+
+
+class UploadRejected(ValueError):
+    # Message seedha UI / batch CSV ke status mein jata hai
+    pass
+
+
+def _pixel_bytes(mode):
+    # PIL ki andar ki storage: RGB bhi 4 bytes per pixel
+    if mode in ("1", "L", "P"):
+        return 1
+    return 2 if mode.startswith("I;16") else 4
+
+
+def inspect_upload(data, target=None, max_pixels=MAX_IMAGE_PIXELS):
+    # Sirf header parhna (decode nahi): {format, size, mode, decode_size, decode_bytes}
+    try:
+        # Pixel limit hum khud neeche check karte hain; PIL ki bomb warning sirf isi call ke liye chup
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            image = Image.open(io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data)
+    except Image.DecompressionBombError:
+        raise UploadRejected("Too Many Pixels") from None
+    except (OSError, SyntaxError, ValueError):
+        raise UploadRejected("Not an Image") from None
+    with image:
+        if image.format not in FORMATS:
+            raise UploadRejected(f"Unsupported Format ({image.format})")
+        width, height = image.size
+        if max_pixels and width * height > max_pixels:
+            raise UploadRejected(f"Too Many Pixels ({width * height / 1e6:.0f} MP)")
+        info = {"format": image.format, "size": image.size, "mode": image.mode}
+        if image.format == "JPEG" and target:
+            # draft() sirf header badalta hai: decoder 1/2, 1/4, 1/8 scale par chalega, size abhi pata chal jata hai
+            image.draft("RGB", target)
+        info["decode_size"] = image.size
+        pixels = image.size[0] * image.size[1]
+        # Decode buffer + RGB conversion ki copy (agar mode RGB nahi)
+        info["decode_bytes"] = pixels * _pixel_bytes(image.mode) + (pixels * 4 if image.mode != "RGB" else 0)
+        if image.format == "WEBP":
+            # libwebp pehle apne RGBA buffer mein decode karta hai, phir Python bytes, phir PIL image: ~4 copies
+            info["decode_bytes"] = pixels * 4 * WEBP_COPIES
+        info["decode_bytes"] += DECODER_BYTES
+        return info
+
+
+def resize_bytes(size, out_size):
+    # PIL resize ki copies: pehle horizontal pass (out_w x h) ki temp image, phir output (out_w x out_h)
+    (width, height), (out_w, out_h) = size, out_size
+    if (out_w, out_h) == (width, height):
+        return 0
+    return (out_w * height + out_w * out_h) * 4
+
+
+def thumbnail_bytes(size, side, reducing_gap=2.0):
+    # Image.thumbnail((side, side), reducing_gap): pehle reduce() ki copy (final ke ~reducing_gap guna), phir resize
+    width, height = size
+    scale = min(side / width, side / height)
+    if scale >= 1:
+        return 0
+    out = (max(round(width * scale), 1), max(round(height * scale), 1))
+    fx, fy = max(int(width / out[0] / reducing_gap), 1), max(int(height / out[1] / reducing_gap), 1)
+    reduced = (-(-width // fx), -(-height // fy))
+    return (reduced[0] * reduced[1] * 4 if (fx, fy) != (1, 1) else 0) + resize_bytes(reduced, out)
+
+
+class DecodeBudget:
+    # Process bhar mein ek saath chal rahe decodes ki memory (0 = no limit); poora na aaye to intezar
+    def __init__(self, limit_mb, timeout=DECODE_TIMEOUT):
+        self.limit = limit_mb * 1024 * 1024
+        self.timeout = timeout
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        with self._cond:
+            if self.limit and nbytes > self.limit:
+                self.rejected += 1
+                raise UploadRejected(f"Too Large to Decode ({nbytes / 2**20:.0f} MB)")
+            if self.limit and self.in_use + nbytes > self.limit:
+                self.waits += 1
+                if not self._cond.wait_for(lambda: self.in_use + nbytes <= self.limit, self.timeout):
+                    self.rejected += 1
+                    raise UploadRejected("Server Busy, Try Again")
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_use -= nbytes
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"limit_mb": self.limit / 2**20, "in_use_mb": self.in_use / 2**20, "peak_mb": self.peak / 2**20,
+                    "waits": self.waits, "rejected": self.rejected}
+
+
+def release_freed_images():
+    # Process bhar ki malloc setting: startup par EK baar (app ka cached resource / tool ka main), import par nahi.
+    # Kyun: glibc bari allocation free hone par apni mmap threshold (32 MB tak) barha deta hai; phir image
+    # buffers har thread ke malloc arena se aate hain aur free hone ke baad bhi wahin rehte hain (8 threads par
+    # ~200 MB). DecodeBudget sirf chal rahe decodes ginta hai, to RSS budget se upar nikal jata. Threshold fix
+    # karne se MMAP_THRESHOLD se bari har allocation free hote hi OS ko wapas. glibc na ho (macOS, musl) to
+    # kuch nahi; returns True agar setting lagi
+    path = ctypes.util.find_library("c")
+    try:
+        libc = ctypes.CDLL(path)
+        mallopt = libc.mallopt
+    except (OSError, AttributeError, TypeError):
+        return False
+    return bool(mallopt(M_MMAP_THRESHOLD, MMAP_THRESHOLD) and mallopt(M_TRIM_THRESHOLD, MMAP_THRESHOLD))
+
+
+BUDGET = DecodeBudget(DECODE_BUDGET_MB)
+
+
+@contextmanager
+def admitted(data, target=None, budget=None, work=None):
+    # Header check + memory reservation; andar decode karo aur sirf chhoti (model / preview) image le kar niklo.
+    # work(decode_size): decode ke baad resize / thumbnail ki copies (bytes), reservation mein shamil
+    info = inspect_upload(data, target)
+    info["work_bytes"] = work(info["decode_size"]) if work else 0
+    with (budget or BUDGET).reserve(info["decode_bytes"] + info["work_bytes"]), warnings.catch_warnings():
+        warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+        try:
+            yield info
+        except UploadRejected:
+            raise
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            # Header theek tha magar data toota hua (truncated / corrupt)
+            raise UploadRejected("Corrupt Image") from None
@@ -0,0 +1,81 @@
+# --- BACKGROUND MODEL LOADER: Home page torch ke baghair, model peeche warm hota hai ---
+# Is file ke top par torch/transformers import NAHI karne: wo loader thread mein hote hain
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+PROCESS_START = time.perf_counter()
+
+
+class ModelLoader:
+    def __init__(self, model_path, precision="fp32", backend="eager", allow_random_init=False, service_options=None,
+                 cascade=None):
+        self.model_path = model_path
+        self.allow_random_init = allow_random_init
+        self.precision = precision
+        self.backend = backend
+        self.state = "idle"  # idle -> loading -> ready | failed
+        self.error = None
+        self.model = self.processor = self.device = None
+        self.service = None
+        self.service_options = service_options or {}
+        self.cascade = cascade
+        self.profile = OrderedDict()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def _timed(self, name, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.profile[name] = time.perf_counter() - start
+        return result
+
+    def _load(self):
+        try:
+            self.profile["queued_after_process_start"] = time.perf_counter() - PROCESS_START
+            self._timed("import_torch", lambda: __import__("torch"))
+            self._timed("import_transformers", lambda: __import__("transformers"))
+            inference = self._timed("import_inference", lambda: __import__("inference"))
+            import compiled_backend
+
+            self.model, self.processor, self.device = self._timed("load_model", lambda: inference.load_classifier(
+                self.model_path, precision=self.precision, backend=self.backend,
+                allow_random_init=self.allow_random_init, cascade=self.cascade))
+            self._timed("first_inference", lambda: compiled_backend.warm_up(self.model, self.device, runs=1))
+            self._timed("warm_up", lambda: compiled_backend.warm_up(self.model, self.device, runs=1))
+            from inference_service import InferenceService
+
+            self.service = InferenceService(self.model, self.device, **self.service_options)
+            self.profile["ready_after_process_start"] = time.perf_counter() - PROCESS_START
+            self.state = "ready"
+        except Exception as e:
+            # Error print karega agar phir bhi masla hua
+            print(f"Error: {e}")
+            traceback.print_exc()
+            self.error = e
+            self.state = "failed"
+        finally:
+            self._ready.set()
+
+    def start(self):
+        with self._lock:
+            if self.state != "idle":
+                return self
+            self.state = "loading"
+        threading.Thread(target=self._load, name="model-loader", daemon=True).start()
+        return self
+
+    def wait(self, timeout=None):
+        # True jab loading khatam (ready ya failed)
+        return self._ready.wait(timeout)
+
+    def close(self):
+        # Registry se evict hone par workers band (model ke references chhor dete hain)
+        if self.service is not None:
+            self.service.close()
+
+    def report(self):
+        return {"state": self.state, "precision": self.precision, "backend": self.backend,
+                "cascade": self.model.stats() if hasattr(self.model, "early") else None,
+                "stages_s": dict(self.profile), "error": str(self.error) if self.error else None}
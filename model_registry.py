@@ -0,0 +1,151 @@
+# --- MODEL REGISTRY: har fasal ka apna model folder, memory budget ke andar LRU ---
+# model_loader ki tarah: is file ke top par torch import NAHI (Home page torch ke baghair)
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from model_loader import ModelLoader
+
+REQUIRED_FILES = ("config.json", "preprocessor_config.json", "model.safetensors")
+# "mera_potato_model" -> potato ; models/<crop>/ -> crop
+FOLDER_PATTERN = re.compile(r"^mera_(\w+?)_model$")
+
+
+def _complete(path):
+    return all(os.path.exists(os.path.join(path, name)) for name in REQUIRED_FILES)
+
+
+def discover_models(root=".", models_dir="models"):
+    found = OrderedDict()
+    for entry in sorted(os.listdir(root)):
+        match = FOLDER_PATTERN.match(entry)
+        path = os.path.join(root, entry)
+        if match and _complete(path):
+            found[match.group(1).lower()] = path
+    extra = os.path.join(root, models_dir)
+    if os.path.isdir(extra):
+        for entry in sorted(os.listdir(extra)):
+            path = os.path.join(extra, entry)
+            if os.path.isdir(path) and _complete(path):
+                found.setdefault(entry.lower(), path)
+    return found
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def resident_bytes(model):
+    # Tensor bytes (mmapped safetensors ke pages OS processes ke darmiyan share karta hai)
+    import torch
+
+    module = getattr(model, "module", model)
+    total = 0
+    for value in module.state_dict().values():
+        # int8 Linear ke packed params (weight, bias) tuple ki shakal mein aate hain
+        for t in value if isinstance(value, (tuple, list)) else (value,):
+            if isinstance(t, torch.Tensor):
+                total += t.numel() * t.element_size()
+    return total
+
+
+class ModelRegistry:
+    def __init__(self, models, memory_budget_bytes=0, precision="fp32", backend="eager", allow_random_init=False,
+                 service_options=None, cascade=None):
+        self.models = OrderedDict(models)
+        self.memory_budget_bytes = memory_budget_bytes  # 0 = koi limit nahi
+        self.precision = precision
+        self.backend = backend
+        self.allow_random_init = allow_random_init
+        self.service_options = service_options or {}
+        self.cascade = cascade
+        self._resident = OrderedDict()  # crop -> ModelLoader, LRU order
+        self._stats = {crop: {"hits": 0, "misses": 0, "loads": 0, "evictions": 0, "load_s": None,
+                              "resident_bytes": 0} for crop in self.models}
+        self._lock = threading.RLock()
+
+    def _estimate(self, crop):
+        weights = os.path.join(self.models[crop], "model.safetensors")
+        size = os.path.getsize(weights) if os.path.exists(weights) else 0
+        return size if size > 1024 else 0  # LFS pointer: load ke baad hi pata chalega
+
+    def _used(self, exclude=None):
+        return sum(self._stats[c]["resident_bytes"] for c in self._resident if c != exclude)
+
+    def _evict_for(self, crop, needed):
+        # Sab se purana (LRU) pehle; jo abhi load ho rahe hain unhein nahi chhedte
+        if not self.memory_budget_bytes:
+            return
+        for victim in list(self._resident):
+            if self._used(exclude=crop) + needed <= self.memory_budget_bytes:
+                break
+            if victim == crop or self._resident[victim].state == "loading":
+                continue
+            self._resident.pop(victim).close()
+            self._stats[victim]["evictions"] += 1
+            self._stats[victim]["resident_bytes"] = 0
+            print(f"Model registry: evicted {victim} to stay within budget")
+
+    def request(self, crop):
+        # Foran return: ModelLoader (ready / loading / failed); zarurat ho to background load shuru
+        if crop not in self.models:
+            raise KeyError(f"No model folder for crop {crop!r}")
+        with self._lock:
+            loader = self._resident.get(crop)
+            if loader is not None and loader.state != "failed":
+                self._resident.move_to_end(crop)
+                if loader.state == "ready":
+                    self._stats[crop]["hits"] += 1
+                return loader
+            self._stats[crop]["misses"] += 1
+            self._evict_for(crop, self._estimate(crop))
+            loader = ModelLoader(self.models[crop], self.precision, self.backend, self.allow_random_init,
+                                 self.service_options, self.cascade)
+            self._resident[crop] = loader
+        threading.Thread(target=self._track, args=(crop, loader), name=f"registry-{crop}", daemon=True).start()
+        return loader.start()
+
+    def run(self, crop, loader, fn):
+        # fn(loader) chalao; beech mein loader evict ho gaya (service band) to registry se naya le kar ek baar dobara
+        from inference_service import ServiceClosed
+
+        try:
+            return fn(loader)
+        except ServiceClosed:
+            fresh = self.request(crop)
+            fresh.wait()
+            if fresh.state != "ready":
+                raise
+            return fn(fresh)
+
+    def peek(self, crop):
+        # Stats/debug ke liye: load ya hit count kiye baghair
+        with self._lock:
+            return self._resident.get(crop)
+
+    def _track(self, crop, loader):
+        rss_before = _rss_bytes()
+        loader.wait()
+        with self._lock:
+            if loader.state != "ready" or self._resident.get(crop) is not loader:
+                return
+            stats = self._stats[crop]
+            stats["loads"] += 1
+            stats["load_s"] = loader.profile.get("load_model")
+            # Compiled (frozen) graph ke tensors state_dict mein nahi hote: RSS se andaza
+            stats["resident_bytes"] = resident_bytes(loader.model) or max(_rss_bytes() - rss_before, 0)
+            self._evict_for(crop, stats["resident_bytes"])
+
+    def stats(self):
+        with self._lock:
+            hits = sum(s["hits"] for s in self._stats.values())
+            lookups = hits + sum(s["misses"] for s in self._stats.values())
+            per_model = {crop: dict(s, state=self._resident[crop].state if crop in self._resident else "unloaded")
+                         for crop, s in self._stats.items()}
+            return {"models": per_model, "resident_bytes": self._used(), "budget_bytes": self.memory_budget_bytes,
+                    "hit_rate": hits / lookups if lookups else 0.0}
@@ -0,0 +1,143 @@
+# --- PREDICTION CACHE: same photo dobara aaye to model dobara nahi chalta ---
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def model_revision(model_path):
+    # config.json badle (labels, architecture) to purane results khud hi invalid
+    with open(os.path.join(model_path, "config.json"), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def content_key(data, revision):
+    return f"{revision}-{hashlib.sha256(data).hexdigest()}"
+
+
+def key_hash(key):
+    # content_key ka photo wala hissa (sha256), revision ke baghair
+    return key.rsplit("-", 1)[1]
+
+
+class PredictionCache:
+    def __init__(self, max_entries=256, disk_dir=None, disk_max_entries=4096):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self.disk_max_entries = disk_max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.disk_errors = 0
+        self._disk_count = 0
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                self._disk_count = len(self._disk_files())
+            except OSError as e:
+                # Disk tier na ban sake to sirf memory cache; app phir bhi chalti hai
+                print(f"Prediction cache dir unavailable ({self.disk_dir}): {e}")
+                self.disk_dir = None
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key + ".npy")
+
+    def _disk_files(self):
+        return [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith(".npy")]
+
+    def _prune_disk(self):
+        # Sab se purani (mtime; disk hit par touch hoti hai) files hata kar limit ke 90% tak: har put par scan nahi
+        files = sorted(self._disk_files(), key=lambda entry: entry.stat().st_mtime)
+        excess = len(files) - int(self.disk_max_entries * 0.9)
+        for entry in files[:max(excess, 0)]:
+            try:
+                os.remove(entry.path)
+                self.disk_evictions += 1
+            except FileNotFoundError:
+                pass
+        self._disk_count = len(files) - max(excess, 0)
+
+    def _remember(self, key, probs):
+        self._entries[key] = probs
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            probs = self._entries.get(key)
+            if probs is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return probs
+        if self.disk_dir:
+            try:
+                probs = np.load(self._disk_path(key))
+            except (OSError, ValueError):
+                probs = None
+            if probs is not None:
+                try:
+                    os.utime(self._disk_path(key))  # prune ke liye "recently used"
+                except OSError:
+                    pass
+                with self._lock:
+                    self._remember(key, probs)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return probs
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, probs):
+        probs = np.asarray(probs, dtype=np.float32)
+        with self._lock:
+            self._remember(key, probs)
+        if self.disk_dir:
+            self._put_disk(key, probs)
+
+    def _put_disk(self, key, probs):
+        # Pehle temp file, phir rename: adhi likhi file kabhi read nahi hogi.
+        # Disk bhari / read-only ho to sirf log; diagnosis fail nahi hona chahiye
+        path = self._disk_path(key)
+        tmp = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            new = not os.path.exists(path)
+            with open(tmp, "wb") as f:
+                np.save(f, probs)
+            os.replace(tmp, path)
+            with self._lock:
+                self._disk_count += new
+                if self.disk_max_entries and self._disk_count > self.disk_max_entries:
+                    self._prune_disk()
+        except OSError as e:
+            with self._lock:
+                self.disk_errors += 1
+            print(f"Prediction cache write failed ({path}): {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_entries": self._disk_count,
+                "disk_evictions": self.disk_evictions,
+                "disk_errors": self.disk_errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,91 @@
+# --- FAST PREPROCESSING: JPEG draft decode, ek resize, ek vectorized normalize ---
+import io
+import threading
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import AutoImageProcessor
+
+from ingestion import resize_bytes, thumbnail_bytes
+
+# On-screen preview ka lamba side (model ko is se koi farq nahi)
+PREVIEW_SIDE = 640
+
+
+class Preprocessor:
+    # ViTImageProcessor jaisa output: {"pixel_values": (N, 3, H, W) float32}
+    def __init__(self, size=(224, 224), resample=Image.BILINEAR, rescale_factor=1 / 255,
+                 image_mean=(0.5, 0.5, 0.5), image_std=(0.5, 0.5, 0.5)):
+        self.size = tuple(size)
+        self.resample = resample
+        # uint8 ki sirf 256 values hain: rescale + normalize pehle se table mein, phir ek gather
+        values = (np.arange(256, dtype=np.float64) * rescale_factor).astype(np.float32)
+        mean = np.asarray(image_mean, dtype=np.float32)[:, None]
+        std = np.asarray(image_std, dtype=np.float32)[:, None]
+        self.lut = ((values[None, :] - mean) / std).astype(np.float32)
+        self._local = threading.local()
+
+    @classmethod
+    def from_pretrained(cls, model_path):
+        hf = AutoImageProcessor.from_pretrained(model_path)
+        size = (hf.size["width"], hf.size["height"])
+        return cls(size, Image.Resampling(int(hf.resample)), hf.rescale_factor, hf.image_mean, hf.image_std)
+
+    def open(self, data, target=None):
+        image = Image.open(io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data)
+        if image.format == "JPEG":
+            # Decoder khud 1/2, 1/4, 1/8 scale par decode karta hai (target se chhota kabhi nahi)
+            image.draft("RGB", target or self.size)
+        return image if image.mode == "RGB" else image.convert("RGB")
+
+    def resize(self, image):
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return image if image.size == self.size else image.resize(self.size, self.resample)
+
+    def decode(self, data, preview_side=PREVIEW_SIDE):
+        # Returns (model-size image, chhota preview); data = upload ke bytes
+        image = self.open(data)
+        model_image = self.resize(image)
+        if max(image.size) < preview_side:
+            # JPEG draft ne model ke size tak decode kiya tha, preview ke liye thora bara chahiye
+            image = self.open(data, (preview_side, preview_side))
+        image.thumbnail((preview_side, preview_side), reducing_gap=2.0)
+        return model_image, image
+
+    def working_bytes(self, size, preview_side=None):
+        # resize() (aur preview_side par decode() ka thumbnail) ki copies, decoded image ke ilawa: ingestion budget
+        work = resize_bytes(size, self.size)
+        if preview_side:
+            work += thumbnail_bytes(size, preview_side)
+        return work
+
+    def _buffer(self, n):
+        # Har thread ka apna buffer, har call par wahi memory dobara (result agle call tak hi valid)
+        buf = getattr(self._local, "buf", None)
+        if buf is None or buf.shape[0] < n:
+            buf = np.empty((n, 3, self.size[1], self.size[0]), dtype=np.float32)
+            self._local.buf = buf
+        return buf[:n]
+
+    def normalize(self, images):
+        # HWC -> CHW sirf view (transpose), copy nahi.
+        # CONTRACT: lautaya hua tensor is thread ke reusable buffer par view hai — isi thread ki agli
+        # normalize / normalize_arrays / __call__ call use overwrite kar degi. Forward pass tak istemal karo;
+        # batch is se aage rakhna ho to .clone() (tools/check_preprocessing ye contract check karta hai)
+        return self.normalize_arrays([np.asarray(self.resize(image)).transpose(2, 0, 1) for image in images])
+
+    def normalize_arrays(self, arrays):
+        # arrays: (3, H, W) uint8, model size ke (strided views bhi chalte hain, jaise field tiles).
+        # normalize wala buffer contract yahan bhi: agli call tak hi valid
+        out = self._buffer(len(arrays))
+        for i, pixels in enumerate(arrays):
+            for c in range(3):
+                np.take(self.lut[c], pixels[c], out=out[i, c])
+        return torch.from_numpy(out)
+
+    def __call__(self, images, return_tensors="pt"):
+        if isinstance(images, Image.Image):
+            images = [images]
+        return {"pixel_values": self.normalize(images)}
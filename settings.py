@@ -0,0 +1,104 @@
+# --- APP SETTINGS (environment variables se override ho sakti hain) ---
+import os
+
+
+def env_flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def invalid_settings():
+    # [(env var, value, allowed)]: app in ko model load se pehle dikhata hai
+    return [(name, value, allowed) for name, value, allowed in (
+        ("PLANT_DOCTOR_PRECISION", PRECISION, PRECISIONS), ("PLANT_DOCTOR_BACKEND", BACKEND, BACKENDS))
+        if value not in allowed]
+
+
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Model folder aur confidence gate (is se kam par photo reject: "Photo Clear Nahi Hai!")
+MODEL_PATH = os.environ.get("PLANT_DOCTOR_MODEL_PATH", "mera_potato_model")
+MODEL_PATH_SET = "PLANT_DOCTOR_MODEL_PATH" in os.environ  # set ho to discovered potato folder par bhaari
+CONFIDENCE_THRESHOLD = 90
+
+# Doosri fasalon ke model folders (models/<crop>/), aur resident models ka memory budget (0 = no limit)
+MODELS_DIR = os.environ.get("PLANT_DOCTOR_MODELS_DIR", "models")
+MODEL_MEMORY_BUDGET_MB = env_int("PLANT_DOCTOR_MODEL_BUDGET_MB", 1024)
+
+# Prediction cache: memory mein kitne results, disk folder (khali = sirf memory) aur disk par kitne (0 = no limit)
+PREDICTION_CACHE_SIZE = env_int("PLANT_DOCTOR_CACHE_SIZE", 256)
+PREDICTION_CACHE_DIR = os.environ.get("PLANT_DOCTOR_CACHE_DIR", "")
+PREDICTION_CACHE_DISK_SIZE = env_int("PLANT_DOCTOR_CACHE_DISK_SIZE", 4096)
+
+# Timing: debug flag UI mein breakdown dikhata hai (ya URL mein ?debug=1)
+DEBUG = env_flag("PLANT_DOCTOR_DEBUG")
+METRICS_PORT = env_int("PLANT_DOCTOR_METRICS_PORT", 0)
+METRICS_FILE = os.environ.get("PLANT_DOCTOR_METRICS_FILE", "")
+
+# Model precision: fp32 (default), int8 (dynamic quantized Linear layers) ya bf16
+PRECISIONS = ("fp32", "int8", "bf16")
+PRECISION = os.environ.get("PLANT_DOCTOR_PRECISION", "fp32").lower()
+
+# Inference backend: eager (HF forward) ya compiled (TorchScript artifact, eager fallback ke saath)
+BACKENDS = ("eager", "compiled")
+BACKEND = os.environ.get("PLANT_DOCTOR_BACKEND", "eager").lower()
+
+# Weather: "Naam:lat,lon;Naam2:lat,lon" farms, cache kitne seconds fresh, aur API URL (testing ke liye local)
+FARM_LOCATIONS = os.environ.get("PLANT_DOCTOR_FARMS", "")
+WEATHER_TTL = env_int("PLANT_DOCTOR_WEATHER_TTL", 600)
+WEATHER_URL = os.environ.get("PLANT_DOCTOR_WEATHER_URL", "https://api.open-meteo.com/v1/forecast")
+
+# Inference service: saare sessions ek queue mein; workers (cores mein baante), micro-batch size aur max intezar
+INFERENCE_WORKERS = env_int("PLANT_DOCTOR_WORKERS", 1)
+INFERENCE_MAX_BATCH = env_int("PLANT_DOCTOR_MAX_BATCH", 8)
+INFERENCE_MAX_WAIT_MS = env_int("PLANT_DOCTOR_MAX_WAIT_MS", 10)
+INFERENCE_PIN_CORES = env_flag("PLANT_DOCTOR_PIN_CORES")
+# Ek request ka zyada se zyada intezar (seconds): is ke baad error, session hamesha ke liye nahi atakta
+INFERENCE_TIMEOUT = env_float("PLANT_DOCTOR_INFERENCE_TIMEOUT", 60)
+
+# Cascade: pehle sasta pass (CASCADE_SIZE px, CASCADE_LAYERS encoder layers; 0 = sab), sirf itne confident
+# (aur top-2 mein itna faasla, percent) na ho to poora 224px ViT. Sirf eager backend ke saath.
+CASCADE = env_flag("PLANT_DOCTOR_CASCADE")
+CASCADE_SIZE = env_int("PLANT_DOCTOR_CASCADE_SIZE", 112)
+CASCADE_LAYERS = env_int("PLANT_DOCTOR_CASCADE_LAYERS", 0)
+CASCADE_THRESHOLD = env_int("PLANT_DOCTOR_CASCADE_THRESHOLD", 95)
+CASCADE_MARGIN = env_int("PLANT_DOCTOR_CASCADE_MARGIN", 0)
+
+# Field photo (tiled): photo ka lamba side kitna (zyada = zyada tiles), tiles ka faasla, batch aur memory cap
+FIELD_MAX_SIDE = env_int("PLANT_DOCTOR_FIELD_MAX_SIDE", 896)
+TILE_STRIDE = env_int("PLANT_DOCTOR_TILE_STRIDE", 112)
+TILE_BATCH = env_int("PLANT_DOCTOR_TILE_BATCH", 16)
+TILE_MEMORY_MB = env_int("PLANT_DOCTOR_TILE_MEMORY_MB", 256)
+
+# Embedding index (opt-in, khali dir = band): har check ki hui photo ka ViT vector aur chhota thumbnail disk par.
+# Itni cosine similarity par purana jawab dobara (near-duplicate), aur UI mein itne milte julte purane cases.
+# Mode: auto / exact / lsh
+EMBEDDING_INDEX_DIR = os.environ.get("PLANT_DOCTOR_INDEX_DIR", "")
+SIMILARITY_THRESHOLD = env_float("PLANT_DOCTOR_SIMILARITY", 0.995)
+SIMILAR_CASES = env_int("PLANT_DOCTOR_SIMILAR_CASES", 3)
+INDEX_MODE = os.environ.get("PLANT_DOCTOR_INDEX_MODE", "auto").lower()
+
+# Diagnosis history (SQLite, khali = band): har result background mein likha jata hai, Dashboard isi se
+HISTORY_DB = os.environ.get("PLANT_DOCTOR_HISTORY_DB", "plant_doctor_history.db")
+
+# Test-time augmentation: gate se neeche wali photo ke itne variations ek batch mein (budget ke andar)
+TTA = env_flag("PLANT_DOCTOR_TTA")
+TTA_VARIANTS = env_int("PLANT_DOCTOR_TTA_VARIANTS", 8)
+TTA_BUDGET_MS = env_int("PLANT_DOCTOR_TTA_BUDGET_MS", 1500)
+
+# Upload ingestion: header mein is se zyada pixels = decode se pehle reject; ek saath chal rahe decodes ki
+# memory (MB, 0 = no limit) aur budget khali hone ka intezar (seconds)
+MAX_IMAGE_PIXELS = env_int("PLANT_DOCTOR_MAX_PIXELS", 50_000_000)
+DECODE_BUDGET_MB = env_int("PLANT_DOCTOR_DECODE_BUDGET_MB", 512)
+DECODE_TIMEOUT = env_float("PLANT_DOCTOR_DECODE_TIMEOUT", 10)
@@ -0,0 +1,102 @@
+# --- TILED FIELD ANALYSIS: poori photo 224px ke overlapping tiles mein, har hissay ka apna jawab ---
+import numpy as np
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+from PIL import Image
+
+TILE_STRIDE = 112  # 224 tile par 50% overlap
+# Ek tile ka andazan working set (float32 input + ViT-B activations), batch size isi se capped
+TILE_WORKING_BYTES = 12 * 1024 * 1024
+
+
+def is_healthy_label(label):
+    return "healthy" in label.lower() or "healty" in label.lower()
+
+
+def grid_shape(size, tile, stride, max_side):
+    # (cols, rows): photo max_side tak chhoti, phir jitne tiles poore aate hain
+    scale = min(1.0, max_side / max(size))
+    return tuple(max(0, round((side * scale - tile) / stride)) + 1 for side in size)
+
+
+def fit_to_grid(processor, data, stride=TILE_STRIDE, max_side=896):
+    # Ek decode (JPEG draft) + ek resize: size bilkul tile + n*stride, taake tiles kinaron tak poore aayein
+    tile = processor.size[0]
+    if tile % stride:
+        raise ValueError(f"Tile stride {stride} must divide the tile size {tile}")
+    image = processor.open(data, (max_side, max_side))
+    cols, rows = grid_shape(image.size, tile, stride, max_side)
+    target = (tile + (cols - 1) * stride, tile + (rows - 1) * stride)
+    return image if image.size == target else image.resize(target, processor.resample)
+
+
+def tile_windows(image, tile, stride=TILE_STRIDE):
+    # (rows, cols, 3, tile, tile) uint8 view: koi tile copy nahi hoti
+    pixels = np.asarray(image)
+    return sliding_window_view(pixels, (tile, tile), axis=(0, 1))[::stride, ::stride]
+
+
+def tile_batch_size(max_batch, memory_mb):
+    return max(1, min(max_batch, memory_mb * 1024 * 1024 // TILE_WORKING_BYTES))
+
+
+def classify_tiles(model, processor, image, device, stride=TILE_STRIDE, max_batch=16, memory_mb=256, service=None):
+    # Returns (rows, cols, num_labels) probabilities
+    windows = tile_windows(image, processor.size[0], stride)
+    rows, cols = windows.shape[:2]
+    positions = [(r, c) for r in range(rows) for c in range(cols)]
+    batch = tile_batch_size(max_batch, memory_mb)
+    probs = []
+    for start in range(0, len(positions), batch):
+        pixel_values = processor.normalize_arrays([windows[r, c] for r, c in positions[start:start + batch]])
+        if service is not None:
+            probs.append(service.infer(pixel_values)[0])
+        else:
+            with torch.no_grad():
+                logits = model(pixel_values=pixel_values.to(device, model.dtype)).logits
+            probs.append(torch.softmax(logits.float(), dim=-1).cpu())
+    return torch.cat(probs).reshape(rows, cols, -1).numpy()
+
+
+def disease_map(grid, labels, tile, stride=TILE_STRIDE):
+    # Har stride x stride cell ka bimari score (1 - healthy), us par parne wale saare tiles ka average
+    healthy = [i for i, label in enumerate(labels) if is_healthy_label(label)]
+    scores = 1 - grid[..., healthy].sum(-1) if healthy else grid.max(-1)
+    k = tile // stride
+    rows, cols = scores.shape
+    total = np.zeros((rows + k - 1, cols + k - 1), dtype=np.float32)
+    count = np.zeros_like(total)
+    for dr in range(k):
+        for dc in range(k):
+            total[dr:dr + rows, dc:dc + cols] += scores
+            count[dr:dr + rows, dc:dc + cols] += 1
+    return total / count
+
+
+def heatmap_overlay(image, cells, alpha=0.5):
+    # Sabz (theek) se laal (bimar); jitna zyada score utna gehra rang
+    cells = np.clip(cells, 0, 1)
+    colors = np.stack([cells * 255, (1 - cells) * 200, np.zeros_like(cells)], axis=-1).astype(np.uint8)
+    heat = Image.fromarray(colors).resize(image.size, Image.BILINEAR)
+    mask = Image.fromarray((cells * alpha * 255).astype(np.uint8)).resize(image.size, Image.BILINEAR)
+    return Image.composite(heat, image.convert("RGB"), mask)
+
+
+def field_verdict(grid, labels, threshold):
+    # Sirf confident tiles vote karte hain; koi bhi bimar tile ho to poori photo ka jawab wahi bimari
+    flat = grid.reshape(-1, grid.shape[-1])
+    top = flat.argmax(-1)
+    confident = flat.max(-1) * 100 >= threshold
+    healthy = np.array([is_healthy_label(label) for label in labels])
+    diseased = confident & ~healthy[top]
+    if not confident.any():
+        idx, status = None, "uncertain"
+    elif diseased.any():
+        weights = flat[diseased].sum(0) * ~healthy
+        idx, status = int(weights.argmax()), "diseased"
+    else:
+        idx, status = int(np.bincount(top[confident]).argmax()), "healthy"
+    voters = confident & (top == idx) if idx is not None else confident
+    return {"label": idx, "status": status, "tiles": len(flat),
+            "confident_share": float(confident.mean()), "affected_share": float(diseased.mean()),
+            "confidence": float(flat[voters].max(-1).mean() * 100) if voters.any() else 0.0}
@@ -0,0 +1,158 @@
+# --- TIMING: har stage ka waqt + rolling p50/p95/p99 (Prometheus text format) ---
+import bisect
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; Prometheus histogram ke cumulative buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageTimer:
+    # Ek request ke stages, jis order mein chale
+    def __init__(self):
+        self.stages = OrderedDict()
+        self._open = {}
+
+    def begin(self, name):
+        self._open[name] = time.perf_counter()
+
+    def end(self, name):
+        started = self._open.pop(name, None)
+        if started is not None:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    @contextmanager
+    def stage(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def total(self):
+        return sum(self.stages.values())
+
+
+class _Series:
+    def __init__(self, window, buckets):
+        self.recent = deque(maxlen=window)
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.recent.append(seconds)
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    pos = q * (len(sorted_values) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+class LatencyRegistry:
+    # Process-wide: saare Streamlit sessions yahin record karte hain
+    def __init__(self, window=1000, buckets=DEFAULT_BUCKETS):
+        self.window = window
+        self.buckets = tuple(buckets)
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            series = self._series.get(stage)
+            if series is None:
+                series = self._series[stage] = _Series(self.window, self.buckets)
+            series.observe(seconds)
+
+    def record(self, timer):
+        for stage, seconds in timer.stages.items():
+            self.observe(stage, seconds)
+        self.observe("total", timer.total())
+
+    def quantiles(self, stage):
+        with self._lock:
+            series = self._series.get(stage)
+            values = sorted(series.recent) if series else []
+        return {q: _quantile(values, q) for q in QUANTILES}
+
+    def summary(self):
+        with self._lock:
+            stages = list(self._series)
+        return OrderedDict((stage, self.quantiles(stage)) for stage in stages)
+
+    def render_prometheus(self):
+        name = "plant_doctor_stage_latency_seconds"
+        hist = "plant_doctor_stage_latency_histogram_seconds"
+        out = [
+            f"# HELP {name} Diagnosis stage latency, quantiles over the last {self.window} requests.",
+            f"# TYPE {name} summary",
+        ]
+        with self._lock:
+            snapshot = [(stage, sorted(s.recent), s.count, s.sum, list(s.bucket_counts))
+                        for stage, s in self._series.items()]
+        for stage, values, count, total, _ in snapshot:
+            for q in QUANTILES:
+                out.append(f'{name}{{stage="{stage}",quantile="{q}"}} {_quantile(values, q):.6f}')
+            out.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+            out.append(f'{name}_count{{stage="{stage}"}} {count}')
+        out.append(f"# HELP {hist} Diagnosis stage latency histogram since process start.")
+        out.append(f"# TYPE {hist} histogram")
+        for stage, _, count, total, bucket_counts in snapshot:
+            running = 0
+            for bound, n in zip(self.buckets, bucket_counts):
+                running += n
+                out.append(f'{hist}_bucket{{stage="{stage}",le="{bound}"}} {running}')
+            out.append(f'{hist}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            out.append(f'{hist}_sum{{stage="{stage}"}} {total:.6f}')
+            out.append(f'{hist}_count{{stage="{stage}"}} {count}')
+        return "\n".join(out) + "\n"
+
+    def write_file(self, path):
+        # Saare sessions ek process ke threads hain: temp file har thread ki apni, aur likhna ek waqt mein ek.
+        # Metrics file na likhi ja sake to sirf log; diagnosis fail nahi hona chahiye
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._write_lock:
+            try:
+                with open(tmp, "w") as f:
+                    f.write(self.render_prometheus())
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"Metrics file write failed ({path}): {e}")
+
+
+REGISTRY = LatencyRegistry()
+
+
+def start_metrics_server(port, registry=REGISTRY, host="127.0.0.1"):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,217 @@
+# --- INFERENCE BENCHMARK: real weights / network ke baghair chalta hai ---
+# Run from repo root:
+#   python -m tools.benchmark run --output bench.json
+#   python -m tools.benchmark compare baseline.json bench.json --threshold 0.10
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from tools.synthetic import PHONE_RESOLUTIONS, as_uploads, encode, synthetic_leaf, synthetic_leaves
+
+
+def _percentiles(samples_s):
+    values = sorted(samples_s)
+
+    def pick(q):
+        return values[min(int(q * len(values)), len(values) - 1)] * 1000
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+            "mean_ms": statistics.fmean(values) * 1000}
+
+
+def cold_probe(model_path):
+    # Fresh process mein: imports + model load + pehli inference
+    t0 = time.perf_counter()
+    import torch  # noqa: F401
+    from inference import MODEL_PATH, is_lfs_pointer, load_classifier, predict_probs
+    t1 = time.perf_counter()
+    model_path = model_path or MODEL_PATH
+    model, processor, device = load_classifier(model_path, torch.device("cpu"), allow_random_init=True)
+    t2 = time.perf_counter()
+    predict_probs(model, processor, as_uploads(processor, [synthetic_leaf(1280, 960)]), device)
+    t3 = time.perf_counter()
+    print(json.dumps({"import_s": t1 - t0, "load_s": t2 - t1, "first_inference_s": t3 - t2,
+                      "random_weights": is_lfs_pointer(os.path.join(model_path, "model.safetensors"))}))
+
+
+def measure_cold_start(model_path):
+    out = subprocess.run([sys.executable, "-m", "tools.benchmark", "cold-probe", "--model-path", model_path],
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(args):
+    import torch
+    from inference import MODEL_PATH, load_classifier, predict_probs, iter_batches
+
+    args.model_path = args.model_path or MODEL_PATH
+
+    results = {"meta": {
+        "torch": torch.__version__,
+        "transformers": __import__("transformers").__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }, "metrics": {}}
+    metrics = results["metrics"]
+
+    def add(name, value, better="lower"):
+        metrics[name] = {"value": value, "better": better}
+        print(f"{name:<40} {value:10.3f}")
+
+    cold = measure_cold_start(args.model_path)
+    results["meta"]["random_weights"] = cold.pop("random_weights")
+    for key, value in cold.items():
+        add(f"cold_start.{key}", value)
+    add("cold_start.total_s", sum(cold.values()))
+
+    default_threads = torch.get_num_threads()
+    model, processor, device = load_classifier(args.model_path, torch.device("cpu"), allow_random_init=True)
+    leaf, = as_uploads(processor, [synthetic_leaf(1280, 960)])
+    predict_probs(model, processor, [leaf], device)
+
+    # Warm latency distribution (single image, jaisa app mein hota hai)
+    samples = []
+    for _ in range(args.iterations):
+        t = time.perf_counter()
+        predict_probs(model, processor, [leaf], device)
+        samples.append(time.perf_counter() - t)
+    for key, value in _percentiles(samples).items():
+        add(f"warm.{key}", value)
+
+    # Throughput across batch sizes
+    images = as_uploads(processor, synthetic_leaves(max(args.batch_sizes) * 2, (640, 480)))
+    for batch_size in args.batch_sizes:
+        predict_probs(model, processor, images[:batch_size], device)
+        t = time.perf_counter()
+        for batch in iter_batches(images, batch_size):
+            predict_probs(model, processor, batch, device)
+        add(f"throughput.batch{batch_size}_ips", len(images) / (time.perf_counter() - t), "higher")
+
+    # Torch intra-op thread counts
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        predict_probs(model, processor, [leaf], device)
+        samples = []
+        for _ in range(max(args.iterations // 2, 3)):
+            t = time.perf_counter()
+            predict_probs(model, processor, [leaf], device)
+            samples.append(time.perf_counter() - t)
+        add(f"threads.{threads}.p50_ms", _percentiles(samples)["p50_ms"])
+    torch.set_num_threads(default_threads)
+
+    # Input sizes: Potato page ka rasta (draft decode + resize + preview, processor, forward), end to end
+    for width, height in args.resolutions:
+        data = encode(synthetic_leaf(width, height))
+        samples = []
+        for _ in range(args.size_iterations):
+            t = time.perf_counter()
+            image, _ = processor.decode(data)
+            predict_probs(model, processor, [image], device)
+            samples.append(time.perf_counter() - t)
+        add(f"input.{width}x{height}.p50_ms", _percentiles(samples)["p50_ms"])
+
+    # Field photo tiles: tiles/sec vs batch size, aur poori photo ka waqt vs photo ka size
+    from tiling import classify_tiles, fit_to_grid
+
+    data = encode(synthetic_leaf(4000, 3000))
+    field = fit_to_grid(processor, data, max_side=max(args.field_sides))
+    classify_tiles(model, processor, field.crop((0, 0, 448, 224)), device)
+    for batch_size in args.tile_batch_sizes:
+        t = time.perf_counter()
+        grid = classify_tiles(model, processor, field, device, max_batch=batch_size, memory_mb=1 << 20)
+        add(f"tiles.batch{batch_size}_tps", grid.shape[0] * grid.shape[1] / (time.perf_counter() - t), "higher")
+    for side in args.field_sides:
+        t = time.perf_counter()
+        classify_tiles(model, processor, fit_to_grid(processor, data, max_side=side), device,
+                       max_batch=max(args.tile_batch_sizes), memory_mb=1 << 20)
+        add(f"field.{side}px.ms", (time.perf_counter() - t) * 1000)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved: {args.output}")
+    return results
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)["metrics"]
+    with open(args.current) as f:
+        current = json.load(f)["metrics"]
+
+    regressions, missing = [], []
+    print(f"{'metric':<40} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, base in baseline.items():
+        if name not in current:
+            # Stage toot gaya ho to metric hi nahi banta: ye bhi failure hai, chup chaap skip nahi
+            print(f"{name:<40} {base['value']:10.3f} {'-':>10} {'':>8}  MISSING")
+            missing.append(name)
+            continue
+        old, new = base["value"], current[name]["value"]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = change > args.threshold if base["better"] == "lower" else change < -args.threshold
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:<40} {old:10.3f} {new:10.3f} {change:+8.1%}{flag}")
+        if worse:
+            regressions.append(name)
+
+    if missing:
+        print(f"\n{len(missing)} baseline metric(s) missing from the current run: {', '.join(missing)}")
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}")
+    if missing or regressions:
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+def _resolution(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    # inference (torch) yahan import nahi karte, warna cold-probe ka import time zero aata
+    parser = argparse.ArgumentParser(description="Offline benchmark for the ViT diagnosis path.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run the benchmark and write JSON results.")
+    run_p.add_argument("--model-path", default=None)
+    run_p.add_argument("--output", default="bench.json")
+    run_p.add_argument("--iterations", type=int, default=20)
+    run_p.add_argument("--size-iterations", type=int, default=3)
+    run_p.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    run_p.add_argument("--threads", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    run_p.add_argument("--resolutions", type=_resolution, nargs="+", default=PHONE_RESOLUTIONS)
+    run_p.add_argument("--tile-batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    run_p.add_argument("--field-sides", type=int, nargs="+", default=[448, 672, 896])
+
+    cmp_p = sub.add_parser("compare", help="Fail (exit 1) if current regressed past threshold vs baseline.")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10)
+
+    probe_p = sub.add_parser("cold-probe", help=argparse.SUPPRESS)
+    probe_p.add_argument("--model-path", default=None)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        sys.exit(compare(args))
+    else:
+        cold_probe(args.model_path)
+
+
+if __name__ == "__main__":
+    main()
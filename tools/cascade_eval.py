@@ -0,0 +1,105 @@
+# --- CASCADE EVAL: kitni photos sasta pass hi nipta deta hai, kitna waqt bacha, poore model se kitna match ---
+# Run from repo root:
+#   python -m tools.cascade_eval --images path/to/labeled --thresholds 90 95 98 --size 112 160
+# Labeled set: har class ka folder (Early_blight/, Healty/, Late_blight/ ...), folder ka naam = label.
+import argparse
+import os
+import re
+import time
+
+import torch
+from cascade import cheap_logits, early_exit_mask
+from inference import CONFIDENCE_THRESHOLD, IMAGE_TYPES, MODEL_PATH, PRECISIONS, load_classifier
+from tools.synthetic import as_uploads, synthetic_leaves
+
+
+def _norm(label):
+    return re.sub(r"[^a-z0-9]", "", label.lower())
+
+
+def load_labeled(folder, id2label, limit, processor):
+    # Returns [(image, {label indices} ya None)]; model mein "late_blight" do baar ho sakta hai
+    by_name = {}
+    for idx, label in id2label.items():
+        by_name.setdefault(_norm(label), set()).add(int(idx))
+    samples = []
+    for root, _, files in sorted(os.walk(folder)):
+        target = by_name.get(_norm(os.path.basename(root)))
+        for name in sorted(files):
+            if name.rsplit(".", 1)[-1].lower() in IMAGE_TYPES:
+                # Batch mode jaisa: draft decode, phir model size
+                samples.append((processor.resize(processor.open(os.path.join(root, name))), target))
+                if len(samples) >= limit:
+                    return samples
+    return samples
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the cheap-first cascade against the full model.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--images", help="Labeled folder (one sub-folder per class); default: synthetic leaves")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--precision", default="fp32", choices=PRECISIONS)
+    parser.add_argument("--size", type=int, nargs="+", default=[112], help="Cheap-stage input sizes")
+    parser.add_argument("--layers", type=int, nargs="+", default=[0], help="Cheap-stage encoder layers (0 = all)")
+    parser.add_argument("--thresholds", type=int, nargs="+", default=[90, 95, 98])
+    parser.add_argument("--margin", type=int, default=0)
+    args = parser.parse_args()
+
+    device = torch.device("cpu")
+    model, processor, _ = load_classifier(args.model_path, device, allow_random_init=True, precision=args.precision)
+    if args.images:
+        samples = load_labeled(args.images, model.config.id2label, args.limit, processor)
+    else:
+        samples = [(img, None) for img in as_uploads(processor, synthetic_leaves(min(args.limit, 32), (640, 480)))]
+    labeled = [i for i, (_, target) in enumerate(samples) if target is not None]
+    print(f"{len(samples)} images ({len(labeled)} labeled), precision {args.precision}")
+
+    # Ek ek photo (Potato page jaisa batch 1): har photo ka poora aur sasta waqt alag
+    pixels = [processor(images=[image])["pixel_values"].clone().to(device, model.dtype) for image, _ in samples]
+    full, full_s = [], []
+    with torch.no_grad():
+        model(pixel_values=pixels[0])  # warm-up
+        for p in pixels:
+            logits, seconds = timed(lambda: model(pixel_values=p).logits)
+            full.append(torch.softmax(logits.float(), dim=-1)[0])
+            full_s.append(seconds)
+    full = torch.stack(full)
+    full_ms = sum(full_s) / len(full_s) * 1000
+    print(f"full model: {full_ms:.1f} ms/image")
+
+    def accuracy(probs):
+        hits = [int(probs[i].argmax()) in samples[i][1] for i in labeled]
+        return f"{sum(hits) / len(hits):6.1%}" if hits else "     -"
+
+    print(f"{'size':>5} {'layers':>6} {'thresh':>6} {'early':>7} {'ms/img':>7} {'saved':>7} {'agree':>7} "
+          f"{'gate':>7} {'acc':>6} {'full acc':>8}")
+    for size in args.size:
+        for layers in args.layers:
+            cheap, cheap_s = [], []
+            with torch.no_grad():
+                cheap_logits(model, pixels[0], size, layers)  # warm-up
+                for p in pixels:
+                    logits, seconds = timed(lambda: cheap_logits(model, p, size, layers))
+                    cheap.append(torch.softmax(logits.float(), dim=-1)[0])
+                    cheap_s.append(seconds)
+            cheap = torch.stack(cheap)
+            for threshold in args.thresholds:
+                early = early_exit_mask(cheap, threshold, args.margin)
+                cascade = torch.where(early[:, None], cheap, full)
+                ms = sum(c + (0 if e else f) for c, f, e in zip(cheap_s, full_s, early.tolist())) / len(pixels) * 1000
+                agree = (cascade.argmax(-1) == full.argmax(-1)).float().mean()
+                gate = ((cascade.max(-1).values * 100 >= CONFIDENCE_THRESHOLD)
+                        == (full.max(-1).values * 100 >= CONFIDENCE_THRESHOLD)).float().mean()
+                print(f"{size:>5} {layers or 'all':>6} {threshold:>6} {early.float().mean():>7.1%} {ms:>7.1f} "
+                      f"{1 - ms / full_ms:>7.1%} {agree:>7.1%} {gate:>7.1%} {accuracy(cascade)} {accuracy(full):>8}")
+
+
+if __name__ == "__main__":
+    main()
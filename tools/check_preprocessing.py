@@ -0,0 +1,158 @@
+# --- PREPROCESSING CHECK: fast path == ViTImageProcessor (tolerance ke andar) + RSS/latency numbers ---
+# Run from repo root:  python -m tools.check_preprocessing
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from inference import MODEL_PATH
+from tools.synthetic import encode, synthetic_leaf
+
+# JPEG draft decode DCT scaling se thora farq deta hai; lossless formats bilkul same hone chahiyein
+TOLERANCES = {"JPEG": (0.05, 0.005), "PNG": (1e-6, 1e-7), "WEBP": (1e-6, 1e-7)}
+
+
+def check_equivalence(model_path):
+    from transformers import AutoImageProcessor
+    from preprocessing import Preprocessor
+
+    hf = AutoImageProcessor.from_pretrained(model_path)
+    fast = Preprocessor.from_pretrained(model_path)
+    ok = True
+    for fmt, (max_tol, mean_tol) in TOLERANCES.items():
+        for seed, (width, height) in enumerate([(4032, 3024), (1080, 1920), (500, 375)]):
+            data = encode(synthetic_leaf(width, height, seed=seed), fmt)
+            expected = hf(images=Image.open(io.BytesIO(data)).convert("RGB"), return_tensors="pt")["pixel_values"]
+            model_image, _ = fast.decode(data)
+            actual = fast([model_image])["pixel_values"]
+            diff = (actual - expected).abs()
+            passed = tuple(actual.shape) == tuple(expected.shape) and diff.max() <= max_tol and diff.mean() <= mean_tol
+            ok &= bool(passed)
+            print(f"{fmt:<5} {width}x{height:<5} max {diff.max():.2e}  mean {diff.mean():.2e}  {'ok' if passed else 'FAIL'}")
+    return ok
+
+
+def check_buffer_contract(model_path):
+    # normalize() ka tensor thread ke buffer par view hai: agli call usi thread par overwrite karti hai,
+    # doosre thread ka buffer alag, aur .clone() mehfooz. Ye badle to callers ko pata hona chahiye
+    import threading
+
+    from preprocessing import Preprocessor
+
+    fast = Preprocessor.from_pretrained(model_path)
+    dark, light = Image.new("RGB", fast.size, (0, 0, 0)), Image.new("RGB", fast.size, (255, 255, 255))
+    first = fast([dark])["pixel_values"]
+    kept = first.clone()
+    second = fast([light])["pixel_values"]
+    other = []
+    thread = threading.Thread(target=lambda: other.append(fast([dark])["pixel_values"]))
+    thread.start()
+    thread.join()
+    checks = {
+        "same-thread calls share the buffer": first.data_ptr() == second.data_ptr() and bool((first == second).all()),
+        "clone survives the next call": not bool((kept == second).all()),
+        "threads use separate buffers": (other[0].data_ptr() != second.data_ptr()
+                                         and bool((second == fast.lut[:, 255][None, :, None, None]).all())),
+    }
+    for name, passed in checks.items():
+        print(f"buffer contract: {name:<38} {'ok' if passed else 'FAIL'}")
+    return all(checks.values())
+
+
+def _peak_rss_mb(reset=False):
+    # Linux: VmHWM ko reset kar ke sirf is step ka peak; warna ru_maxrss (process ka peak)
+    try:
+        if reset:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def probe(method, model_path, path, runs=5):
+    # Alag process mein, taake pichle uploads ka memory asar na aaye
+    from transformers import AutoImageProcessor
+    from preprocessing import Preprocessor
+
+    with open(path, "rb") as f:
+        data = f.read()
+    hf = AutoImageProcessor.from_pretrained(model_path)
+    fast = Preprocessor.from_pretrained(model_path)
+
+    def old_path():
+        # app.py ka purana rasta: full decode, PIL resize, phir processor (dobara resize)
+        image = Image.open(io.BytesIO(data)).convert("RGB")
+        hf(images=image.resize((224, 224)), return_tensors="pt")
+
+    def fast_path():
+        model_image, _ = fast.decode(data)
+        fast([model_image])
+
+    step = old_path if method == "old" else fast_path
+    baseline = _current_rss_mb()
+    _peak_rss_mb(reset=True)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        step()
+        timings.append(time.perf_counter() - start)
+    peak = _peak_rss_mb()
+    print(json.dumps({"ms": sorted(timings)[len(timings) // 2] * 1000, "peak_growth_mb": peak - baseline}))
+
+
+def measure(model_path):
+    print(f"\n{'upload':<16} {'method':<5} {'median latency':>15} {'peak RSS growth':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("JPEG", "PNG"):
+            for width, height in [(4032, 3024), (1920, 1080)]:
+                path = os.path.join(tmp, f"leaf_{width}x{height}.{fmt.lower()}")
+                with open(path, "wb") as f:
+                    f.write(encode(synthetic_leaf(width, height), fmt))
+                for method in ("old", "fast"):
+                    out = subprocess.run([sys.executable, "-m", "tools.check_preprocessing", "--probe", method,
+                                          "--model-path", model_path, "--file", path],
+                                         capture_output=True, text=True, check=True)
+                    r = json.loads(out.stdout.strip().splitlines()[-1])
+                    print(f"{fmt:<4} {width}x{height:<6} {method:<5} {r['ms']:13.1f}ms {r['peak_growth_mb']:14.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the fast preprocessing path against ViTImageProcessor.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--skip-memory", action="store_true")
+    parser.add_argument("--probe", choices=["old", "fast"], help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args.probe, args.model_path, args.file)
+        return
+    ok = check_equivalence(args.model_path)
+    ok &= check_buffer_contract(args.model_path)
+    if not args.skip_memory:
+        measure(args.model_path)
+    if not ok:
+        print("\nCheck FAILED: fast preprocessing does not match ViTImageProcessor.")
+        sys.exit(1)
+    print("\nCheck passed.")
+
+
+if __name__ == "__main__":
+    main()
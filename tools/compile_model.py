@@ -0,0 +1,53 @@
+# --- COMPILE MODEL: deploy se pehle TorchScript artifact banao aur eager se match check karo ---
+# Run from repo root:  python -m tools.compile_model --precision fp32
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+import compiled_backend
+from inference import MODEL_PATH, PRECISIONS, load_classifier
+
+
+def latency_ms(model, device, runs):
+    pixels = compiled_backend._example(model, device)
+    compiled_backend.warm_up(model, device)
+    start = time.perf_counter()
+    with torch.no_grad():
+        for _ in range(runs):
+            model(pixel_values=pixels)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and verify the compiled classifier artifact.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--precision", default="fp32", choices=PRECISIONS)
+    parser.add_argument("--atol", type=float, default=compiled_backend.DEFAULT_ATOL)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the artifact exists")
+    args = parser.parse_args()
+
+    device = torch.device("cpu")
+    eager, _, _ = load_classifier(args.model_path, device, allow_random_init=True, precision=args.precision)
+    path = compiled_backend.artifact_path(args.model_path, args.precision)
+    if args.force or not os.path.exists(path):
+        start = time.perf_counter()
+        compiled_backend.export(eager, path, device, args.precision)
+        print(f"Built {path} in {time.perf_counter() - start:.1f}s")
+
+    compiled = compiled_backend.CompiledClassifier(torch.jit.load(path, map_location=device), eager.config, eager.dtype)
+    diff = compiled_backend.max_logit_diff(eager, compiled, device)
+    print(f"max |logit diff| vs eager: {diff:.2e} (atol {args.atol:.0e})")
+    print(f"eager    {latency_ms(eager, device, args.runs):8.1f} ms")
+    print(f"compiled {latency_ms(compiled, device, args.runs):8.1f} ms")
+    if diff > args.atol:
+        print("Check FAILED: compiled output does not match eager.")
+        sys.exit(1)
+    print("Check passed.")
+
+
+if __name__ == "__main__":
+    main()
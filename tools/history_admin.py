@@ -0,0 +1,155 @@
+# --- HISTORY ADMIN: export (CSV / Parquet, streaming), synthetic load, rollup verify ---
+# Run from repo root:
+#   python -m tools.history_admin export --format parquet --output history.parquet
+#   python -m tools.history_admin --db /tmp/history_load.db seed --rows 10000000
+#   python -m tools.history_admin verify
+import argparse
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from history import HistoryStore, day_of
+from settings import HISTORY_DB
+
+LABELS = ("Early Blight", "Healty", "Late Blight")
+
+
+def export(args):
+    store = HistoryStore(args.db)
+    start, count = time.perf_counter(), 0
+    if args.format == "csv":
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            for chunk in store.iter_csv(args.since, args.crop):
+                f.write(chunk)
+                count += chunk.count("\n")
+        count -= 1  # header
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Row groups mein likho: ek waqt mein sirf ek chunk memory mein
+        writer, chunk = None, []
+        for row in store.iter_rows(args.since, args.crop):
+            chunk.append(row)
+            if len(chunk) == args.chunk:
+                writer = _write_group(pa, pq, writer, args.output, chunk)
+                count, chunk = count + len(chunk), []
+        if chunk or writer is None:
+            writer = _write_group(pa, pq, writer, args.output, chunk)
+            count += len(chunk)
+        writer.close()
+    print(f"Exported {count} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+def _write_group(pa, pq, writer, path, rows):
+    table = pa.Table.from_pylist(rows, schema=_schema(pa))
+    writer = writer or pq.ParquetWriter(path, table.schema)
+    writer.write_table(table)
+    return writer
+
+
+def _schema(pa):
+    return pa.schema([("id", pa.int64()), ("ts", pa.float64()), ("day", pa.string()), ("crop", pa.string()),
+                      ("image_hash", pa.string()), ("label", pa.string()), ("confidence", pa.float64()),
+                      ("accepted", pa.int8()), ("source", pa.string()), ("revision", pa.string()),
+                      ("probs", pa.list_(pa.float32())), ("stages", pa.string())])
+
+
+def seed(args):
+    # Synthetic rows usi writer ke raaste (batched inserts + incremental rollups), phir dashboard queries
+    store = HistoryStore(args.db, batch_size=args.batch)
+    rng = np.random.default_rng(0)
+    now = time.time()
+    start = time.perf_counter()
+    for done in range(0, args.rows, 100_000):
+        n = min(100_000, args.rows - done)
+        ts = now - rng.uniform(0, args.days * 86400, n)
+        probs = rng.dirichlet(np.full(len(LABELS), 0.3), n).astype(np.float32)
+        for t, p in zip(ts, probs):
+            idx = int(p.argmax())
+            store.record("potato", f"{rng.integers(1 << 62):016x}", p, LABELS[idx], p[idx] * 100, p[idx] >= 0.9,
+                         "model", "synthetic", {"forward": 0.4}, ts=float(t))
+        store.flush()
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.rows} rows in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+    since = day_of(now - 29 * 86400)
+    for name, fn in (("daily (rollup)", lambda: store.daily(since)), ("by_label (rollup)", lambda: store.by_label(since))):
+        t = time.perf_counter()
+        fn()
+        print(f"{name:<22} {(time.perf_counter() - t) * 1000:8.1f} ms")
+    conn = sqlite3.connect(args.db)
+    t = time.perf_counter()
+    conn.execute("SELECT day, COUNT(*), SUM(1 - accepted) FROM diagnoses WHERE day >= ? GROUP BY day",
+                 (since,)).fetchall()
+    print(f"{'daily (full scan)':<22} {(time.perf_counter() - t) * 1000:8.1f} ms")
+    conn.close()
+
+
+DUPLICATES = """
+SELECT COUNT(*), COUNT(DISTINCT image_hash) FROM (
+    SELECT image_hash, ts - LAG(ts) OVER (PARTITION BY crop, image_hash, revision ORDER BY ts) AS gap
+    FROM diagnoses
+) WHERE gap <= ?
+"""
+
+
+def verify(args):
+    # Rollup == poori table ka GROUP BY (exit 1 agar farq); dobara aayi photos sirf report
+    store = HistoryStore(args.db)
+    conn = sqlite3.connect(args.db)
+    rollup = conn.execute("SELECT day, crop, label, count, rejected FROM daily_rollup ORDER BY 1, 2, 3").fetchall()
+    scan = conn.execute("SELECT day, crop, label, COUNT(*), SUM(1 - accepted) FROM diagnoses "
+                        "GROUP BY day, crop, label ORDER BY 1, 2, 3").fetchall()
+    # Wahi photo + model revision, pichli row ke window seconds ke andar. Ghalti bhi ho sakti hai (rerun par
+    # dobara record) aur sahi bhi (do kisan ek hi WhatsApp photo, ya doosra tab): table mein session nahi,
+    # is liye sirf jankari, fail nahi
+    repeats, photos = conn.execute(DUPLICATES, (args.window,)).fetchone()
+    conn.close()
+    if repeats:
+        print(f"Info: {repeats} rows repeat a photo within {args.window:g}s ({photos} photos); "
+              f"other sessions or tabs can do this legitimately.")
+    else:
+        print(f"No photo recorded twice within {args.window:g}s.")
+    if rollup == scan:
+        print(f"Rollups match the full table ({len(scan)} day/crop/label groups).")
+        return 0
+    print(f"Rollups differ from the full table: {len(set(rollup) ^ set(scan))} groups.")
+    if args.rebuild:
+        store.rebuild_rollups()
+        print("Rebuilt rollups from the full table.")
+        return 0
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diagnosis history maintenance.")
+    parser.add_argument("--db", default=HISTORY_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="Stream the history to CSV or Parquet.")
+    exp.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    exp.add_argument("--output", required=True)
+    exp.add_argument("--since", default="", help="First day (YYYY-MM-DD)")
+    exp.add_argument("--crop")
+    exp.add_argument("--chunk", type=int, default=50_000, help="Rows per Parquet row group")
+    sd = sub.add_parser("seed", help="Insert synthetic rows and time the dashboard queries.")
+    sd.add_argument("--rows", type=int, default=1_000_000)
+    sd.add_argument("--days", type=int, default=365)
+    sd.add_argument("--batch", type=int, default=1000)
+    vf = sub.add_parser("verify", help="Check rollups against a full rescan.")
+    vf.add_argument("--rebuild", action="store_true", help="Rebuild rollups if they differ")
+    vf.add_argument("--window", type=float, default=300,
+                    help="Report photos (same hash + revision) recorded again within this many seconds")
+    args = parser.parse_args()
+    if args.command == "export":
+        export(args)
+    elif args.command == "seed":
+        seed(args)
+    else:
+        sys.exit(verify(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# --- INDEX CHECK: near-duplicate threshold calibrate karo, aur bara index (exact vs LSH) kitna tez ---
+# Run from repo root:
+#   python -m tools.index_check calibrate --images path/to/leaves
+#   python -m tools.index_check scale --entries 1000000
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from embedding_index import EmbeddingIndex, normalize
+from inference import IMAGE_TYPES, MODEL_PATH, embed_images, load_classifier
+from tools.check_preprocessing import _peak_rss_mb
+from tools.synthetic import as_uploads, encode, synthetic_leaves
+
+
+def variants(image):
+    # Wahi patta, user ke re-upload jaisa: WhatsApp recompress, halka crop, chhota resize
+    w, h = image.size
+    yield "recompressed", Image.open(io.BytesIO(encode(image, quality=35)))
+    yield "cropped", image.crop((w // 20, h // 20, w - w // 20, h - h // 20))
+    yield "resized", image.resize((w // 2, h // 2))
+
+
+def embed(model, processor, images, device):
+    # App wala vector: sasta CLS pass, L2-normalized
+    return normalize(embed_images(model, processor, images, device))
+
+
+def calibrate(args):
+    device = torch.device("cpu")
+    model, processor, _ = load_classifier(args.model_path, device, allow_random_init=True)
+    if args.images:
+        names = sorted(n for n in os.listdir(args.images) if n.rsplit(".", 1)[-1].lower() in IMAGE_TYPES)
+        originals = [Image.open(os.path.join(args.images, n)).convert("RGB") for n in names[:args.limit]]
+    else:
+        originals = synthetic_leaves(min(args.limit, 12), (1280, 960))
+    base = embed(model, processor, as_uploads(processor, originals), device)
+    duplicate = []
+    for i, image in enumerate(originals):
+        for kind, copy in variants(image):
+            duplicate.append(float(base[i] @ embed(model, processor, as_uploads(processor, [copy]), device)[0]))
+    sims = base @ base.T
+    distinct = sims[~np.eye(len(base), dtype=bool)]
+    print(f"near-duplicate similarity: min {min(duplicate):.4f}  median {np.median(duplicate):.4f}")
+    print(f"different-leaf similarity: max {distinct.max():.4f}  median {np.median(distinct):.4f}")
+    if min(duplicate) > distinct.max():
+        print(f"Separable: any threshold in ({distinct.max():.4f}, {min(duplicate):.4f}] works "
+              f"(PLANT_DOCTOR_SIMILARITY)")
+    else:
+        print("Not separable on this set: keep the threshold above the different-leaf max or disable reuse.")
+
+
+def scale(args):
+    rng = np.random.default_rng(0)
+    path = tempfile.mkdtemp(prefix="plant_doctor_index_")
+    try:
+        index = EmbeddingIndex(path, args.dim, 4)
+        start = time.perf_counter()
+        for done in range(0, args.entries, 100_000):
+            n = min(100_000, args.entries - done)
+            vectors = rng.standard_normal((n, args.dim)).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            index.extend(vectors, np.full((n, 4), 0.25, dtype=np.float32))
+        print(f"built {index.count} entries in {time.perf_counter() - start:.1f}s, "
+              f"{index.stats()['disk_bytes'] / 2**20:.0f} MB of rows on disk")
+        del vectors
+
+        start, base = time.perf_counter(), _peak_rss_mb(reset=True)
+        index = EmbeddingIndex(path, args.dim, 4)
+        print(f"reopen: {(time.perf_counter() - start) * 1000:.1f} ms")
+        # Queries: stored vectors thore se hila kar (near-duplicate jaisa)
+        ids = rng.choice(index.count, args.queries, replace=False)
+        queries = index.vectors[ids].astype(np.float32) + rng.normal(0, 0.01, (args.queries, args.dim))
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        for mode in ("exact", "lsh"):
+            start, found = time.perf_counter(), 0
+            for i, q in zip(ids, queries):
+                found += index.search(q, 1, mode=mode)[0]["id"] == i
+            ms = (time.perf_counter() - start) / args.queries * 1000
+            print(f"{mode:>5}: {ms:8.1f} ms/query  recall@1 {found / args.queries:.0%}")
+        # Peak mein mmapped file pages bhi gine jaate hain (OS unhein wapas le sakta hai); apni memory sirf chunk buffer
+        print(f"peak RSS during search: {_peak_rss_mb():.0f} MB incl. mapped pages (before reopen: {base:.0f} MB)")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate and load-test the embedding index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cal = sub.add_parser("calibrate", help="Similarity of re-uploaded copies vs different leaves.")
+    cal.add_argument("--model-path", default=MODEL_PATH)
+    cal.add_argument("--images", help="Folder of distinct leaf photos (default: synthetic leaves)")
+    cal.add_argument("--limit", type=int, default=50)
+    sc = sub.add_parser("scale", help="Build a large synthetic index and time exact vs LSH search.")
+    sc.add_argument("--entries", type=int, default=1_000_000)
+    sc.add_argument("--dim", type=int, default=768)
+    sc.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    calibrate(args) if args.command == "calibrate" else scale(args)
+
+
+if __name__ == "__main__":
+    main()
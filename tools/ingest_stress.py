@@ -0,0 +1,123 @@
+# --- INGEST STRESS: kharab / bohot bari files parallel mein upload path se, peak RSS budget ke andar rehna chahiye ---
+# Run from repo root:
+#   python -m tools.ingest_stress --threads 8 --rounds 3
+#   python -m tools.ingest_stress --budget-mb 0        # budget ke baghair (muqable ke liye, assert nahi)
+# Exit 1 agar peak RSS growth > budget + slack, ya koi file apne expected jawab se mukhtalif
+import argparse
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+from PIL import Image
+
+from ingestion import DecodeBudget, UploadRejected, admitted, release_freed_images
+from preprocessing import PREVIEW_SIDE, Preprocessor
+from tools.check_preprocessing import _current_rss_mb, _peak_rss_mb
+from tools.synthetic import encode, synthetic_leaf
+
+# PNG color types (bit depth, color type, bytes per pixel)
+PNG_MODES = {"1": (1, 0, 1 / 8), "L": (8, 0, 1), "RGB": (8, 2, 3), "RGBA": (8, 6, 4)}
+
+
+def _chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def png_of_zeros(width, height, mode):
+    # Poori image memory mein banaye baghair: rows ek ek kar ke compress (asli decompression bomb jaisi file)
+    depth, color, bpp = PNG_MODES[mode]
+    row = bytes(1 + int(np.ceil(width * bpp)))
+    compressor = zlib.compressobj(6)
+    idat = b"".join(compressor.compress(row) for _ in range(height)) + compressor.flush()
+    return (b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, depth, color, 0, 0, 0))
+            + _chunk(b"IDAT", idat) + _chunk(b"IEND", b""))
+
+
+def pathological_files():
+    # [(name, bytes, expected)]; expected = "ok" ya rejection message ka shuru
+    jpeg = encode(synthetic_leaf(8000, 6000), "JPEG")
+    big_png = png_of_zeros(7000, 5000, "RGB")
+    gif = encode(Image.new("P", (64, 64)), "GIF")
+    return [
+        ("bomb_30k.png", png_of_zeros(30000, 30000, "1"), "Too Many Pixels"),
+        ("bomb_9k.png", png_of_zeros(9000, 9000, "L"), "Too Many Pixels"),
+        ("big_rgba.png", png_of_zeros(6000, 6000, "RGBA"), "ok"),
+        ("big.png", big_png, "ok"),
+        ("huge.jpg", jpeg, "ok"),
+        ("photo.webp", encode(synthetic_leaf(4032, 3024), "WEBP"), "ok"),
+        ("truncated.jpg", jpeg[:len(jpeg) // 3], "Corrupt Image"),
+        ("truncated.png", big_png[:len(big_png) // 2], "Corrupt Image"),
+        ("not_image.png", np.random.default_rng(0).bytes(200_000), "Not an Image"),
+        ("anim.gif", gif, "Unsupported Format"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode pathological uploads in parallel and check peak RSS.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--budget-mb", type=int, default=512, help="Decode memory budget (0 = no limit)")
+    parser.add_argument("--slack-mb", type=int, default=32,
+                        help="Allowed RSS growth above the budget (thread stacks, Python objects)")
+    parser.add_argument("--keep-malloc", action="store_true",
+                        help="Keep glibc's default malloc thresholds (to compare against the app's setting)")
+    args = parser.parse_args()
+
+    if not args.keep_malloc:
+        release_freed_images()  # app ki tarah startup par, files banane se pehle
+    files = pathological_files()
+    processor = Preprocessor()
+    budget = DecodeBudget(args.budget_mb, timeout=600)
+    outcomes, mismatches = Counter(), []
+    lock = threading.Lock()
+
+    def worker(offset):
+        for n in range(args.rounds * len(files)):
+            name, data, expected = files[(offset + n) % len(files)]
+            try:
+                # Wahi rasta jo app.py ka single-photo mode leta hai
+                with admitted(data, (PREVIEW_SIDE, PREVIEW_SIDE), budget,
+                              lambda size: processor.working_bytes(size, PREVIEW_SIDE)):
+                    processor.decode(data)
+                result = "ok"
+            except UploadRejected as e:
+                result = str(e)
+            with lock:
+                outcomes[(name, result)] += 1
+                if not result.startswith(expected):
+                    mismatches.append((name, expected, result))
+
+    baseline = _current_rss_mb()
+    _peak_rss_mb(reset=True)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    growth = _peak_rss_mb() - baseline
+    retained = _current_rss_mb() - baseline
+
+    for (name, result), count in sorted(outcomes.items()):
+        print(f"{name:<15} {result:<32} x{count}")
+    s = budget.stats()
+    print(f"{sum(outcomes.values())} decodes on {args.threads} threads in {elapsed:.1f}s · "
+          f"reserved peak {s['peak_mb']:.0f} MB, {s['waits']} waited")
+    print(f"Peak RSS growth {growth:.0f} MB (baseline {baseline:.0f} MB), still held after the run {retained:.0f} MB")
+    failed = bool(mismatches)
+    for name, expected, result in mismatches[:10]:
+        print(f"Unexpected result for {name}: {result!r} (expected {expected!r})")
+    if args.budget_mb:
+        bound = args.budget_mb + args.slack_mb
+        print(f"Bound {bound} MB: {'ok' if growth <= bound else 'EXCEEDED'}")
+        failed |= growth > bound
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# --- LOAD GENERATOR: kai sessions ek saath, shared inference service ka throughput ---
+# Run from repo root:  python -m tools.load_generator --concurrency 1 2 4 8 --workers 1 2
+import argparse
+import os
+import threading
+import time
+
+import torch
+
+from inference import MODEL_PATH, PRECISIONS, load_classifier
+from inference_service import InferenceService, _percentile
+from tools.synthetic import synthetic_leaves
+
+
+def run(model, processor, device, images, workers, concurrency, duration, max_batch, max_wait_ms, pin_cores):
+    service = InferenceService(model, device, workers, max_batch, max_wait_ms, pin_cores)
+    latencies, lock = [], threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(i):
+        # Har client ek Streamlit session ki tarah: ek photo bhejo, result ka intezar, phir agli
+        n = i
+        while time.perf_counter() < stop_at:
+            pixels = processor(images=[images[n % len(images)]])["pixel_values"]
+            start = time.perf_counter()
+            service.infer(pixels)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+            n += concurrency
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stats = service.stats()
+    service.close(wait=True)
+    batches = stats["batch_sizes"]
+    mean_batch = sum(s * c for s, c in batches.items()) / max(sum(batches.values()), 1)
+    return {"workers": stats["workers"], "concurrency": concurrency, "requests": len(latencies),
+            "throughput": len(latencies) / elapsed, "mean_batch": mean_batch,
+            "p50_ms": _percentile(latencies, 0.5) * 1000, "p95_ms": _percentile(latencies, 0.95) * 1000,
+            "wait_p50_ms": stats["wait_ms"]["p50"], "compute_p50_ms": stats["compute_ms"]["p50"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure inference service throughput vs concurrency and workers.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--precision", default="fp32", choices=PRECISIONS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per configuration")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=int, default=10)
+    parser.add_argument("--pin-cores", action="store_true")
+    args = parser.parse_args()
+
+    device = torch.device("cpu")
+    model, processor, _ = load_classifier(args.model_path, device, allow_random_init=True, precision=args.precision)
+    images = synthetic_leaves(16)
+    print(f"{len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()} cores available")
+    print(f"{'workers':>7} {'clients':>7} {'req/s':>7} {'batch':>6} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'wait ms':>8} {'compute ms':>10}")
+    for workers in args.workers:
+        for concurrency in args.concurrency:
+            r = run(model, processor, device, images, workers, concurrency, args.duration,
+                    args.max_batch, args.max_wait_ms, args.pin_cores)
+            print(f"{r['workers']:>7} {r['concurrency']:>7} {r['throughput']:>7.2f} {r['mean_batch']:>6.1f} "
+                  f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['wait_p50_ms']:>8.0f} {r['compute_p50_ms']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# --- PRECISION PARITY: fp32 vs int8/bf16 same images par, diagnosis aur gate same rehne chahiyein ---
+# Run from repo root:
+#   python -m tools.precision_parity --images path/to/leaves --precision int8 bf16 --strict
+import argparse
+import copy
+import io
+import os
+import pickle
+import sys
+import time
+
+import torch
+from inference import (CONFIDENCE_THRESHOLD, IMAGE_TYPES, MODEL_PATH, apply_precision, iter_batches,
+                       load_classifier, predict_probs)
+from tools.synthetic import as_uploads, synthetic_leaves
+
+
+def load_images(folder, limit, processor):
+    images = []
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if name.rsplit(".", 1)[-1].lower() in IMAGE_TYPES:
+                # Batch mode jaisa: draft decode, phir model size
+                images.append(processor.resize(processor.open(os.path.join(root, name))))
+                if len(images) >= limit:
+                    return images
+    return images
+
+
+def model_bytes(model):
+    # Quantized Linear ke weights parameters() mein nahi aate, is liye serialized size
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf, pickle_protocol=pickle.HIGHEST_PROTOCOL)
+    return buf.tell()
+
+
+def run_all(model, processor, images, device, batch_size):
+    probs, start = [], time.perf_counter()
+    for batch in iter_batches(images, batch_size):
+        probs.append(predict_probs(model, processor, batch, device))
+    return torch.cat(probs), (time.perf_counter() - start) / len(images)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare reduced-precision models against fp32.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--images", help="Folder of leaf photos (default: synthetic leaves)")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--precision", nargs="+", default=["int8", "bf16"], choices=["int8", "bf16"])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--strict", action="store_true", help="Exit 1 on any top-1 or gate disagreement")
+    args = parser.parse_args()
+
+    device = torch.device("cpu")
+    base, processor, _ = load_classifier(args.model_path, device, allow_random_init=True)
+    if args.images:
+        images = load_images(args.images, args.limit, processor)
+    else:
+        images = as_uploads(processor, synthetic_leaves(min(args.limit, 32), (640, 480)))
+    print(f"{len(images)} images, gate = conf < {CONFIDENCE_THRESHOLD}%")
+
+    ref, ref_latency = run_all(base, processor, images, device, args.batch_size)
+    ref_conf, ref_top = ref.max(dim=-1)
+    ref_pass = ref_conf * 100 >= CONFIDENCE_THRESHOLD
+    print(f"{'fp32':<6} {ref_latency * 1000:8.1f} ms/img  {model_bytes(base) / 2**20:7.1f} MiB")
+
+    failed = False
+    for precision in args.precision:
+        reduced, effective = apply_precision(copy.deepcopy(base), precision, device)
+        if effective != precision:
+            print(f"{precision:<6} skipped (not supported here)")
+            continue
+        probs, latency = run_all(reduced, processor, images, device, args.batch_size)
+        conf, top = probs.max(dim=-1)
+        agree = (top == ref_top).float().mean().item()
+        drift = (probs - ref).abs().max().item() * 100
+        flips = int(((conf * 100 >= CONFIDENCE_THRESHOLD) != ref_pass).sum())
+        print(f"{precision:<6} {latency * 1000:8.1f} ms/img  {model_bytes(reduced) / 2**20:7.1f} MiB  "
+              f"top-1 agreement {agree:.1%}  max prob drift {drift:.2f} pts  gate flips {flips}"
+              f"  speedup x{ref_latency / latency:.2f}")
+        failed |= agree < 1.0 or flips > 0
+
+    if args.strict and failed:
+        print("Parity FAILED: reduced precision changes diagnoses or the confidence gate.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
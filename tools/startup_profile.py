@@ -0,0 +1,89 @@
+# --- STARTUP PROFILE: cold start ka kharcha (imports, model load, pehli inference) ---
+# Run from repo root:  python -m tools.startup_profile --output startup.json
+import argparse
+import ast
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def app_imports(path=APP_PATH):
+    # app.py ke top-level imports (function ke andar wale lazy imports nahi), usi order mein; streamlit alag se
+    names = []
+    for node in ast.parse(open(path, encoding="utf-8").read()).body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return [name for name in dict.fromkeys(names) if name.split(".")[0] != "streamlit"]
+
+
+def probe(model_path, precision, backend):
+    # Fresh process: wahi order jo app.py mein hai
+    timings = {}
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+    timings["import_streamlit"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in app_imports():
+        importlib.import_module(name)
+    import model_loader  # model_registry ke andar se aata hai; loader neeche seedha chalate hain
+    timings["import_app_modules"] = time.perf_counter() - start
+    home_imports_torch = "torch" in sys.modules or "transformers" in sys.modules
+
+    weights = os.path.join(model_path, "model.safetensors")
+    with open(weights, "rb") as f:
+        random_weights = f.read(64).startswith(b"version https://git-lfs")
+    loader = model_loader.ModelLoader(model_path, precision, backend, allow_random_init=random_weights)
+    start = time.perf_counter()
+    loader.start().wait()
+    timings["model_ready_after_start"] = time.perf_counter() - start
+
+    print(json.dumps({"home_page_s": timings["import_streamlit"] + timings["import_app_modules"],
+                      "home_imports_torch": home_imports_torch, "random_weights": random_weights,
+                      "timings_s": timings, "loader": loader.report()}))
+
+
+def main():
+    from settings import BACKEND, MODEL_PATH, PRECISION
+
+    parser = argparse.ArgumentParser(description="Profile cold start: imports, model load, first inference.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--precision", default=PRECISION)
+    parser.add_argument("--backend", default=BACKEND)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args.model_path, args.precision, args.backend)
+        return
+
+    out = subprocess.run([sys.executable, "-m", "tools.startup_profile", "--probe", "--model-path", args.model_path,
+                          "--precision", args.precision, "--backend", args.backend],
+                         capture_output=True, text=True, check=True)
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+    for name, seconds in report["timings_s"].items():
+        print(f"{name:<32} {seconds:8.3f}s")
+    for name, seconds in report["loader"]["stages_s"].items():
+        print(f"  loader.{name:<24} {seconds:8.3f}s")
+    print(f"{'home page ready':<32} {report['home_page_s']:8.3f}s")
+    if report["home_imports_torch"]:
+        print("WARNING: Home page imports torch/transformers, cold start is not lazy.")
+    if report["loader"]["state"] != "ready":
+        print(f"Model failed to load: {report['loader']['error']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {args.output}")
+    sys.exit(1 if report["home_imports_torch"] or report["loader"]["state"] != "ready" else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# --- SYNTHETIC LEAVES: asli photos ke baghair benchmarks/checks ke liye ---
+import io
+
+import numpy as np
+from PIL import Image
+
+# Aam phone camera resolutions (width, height)
+PHONE_RESOLUTIONS = [(4032, 3024), (3264, 2448), (1920, 1080), (1280, 960)]
+
+
+def synthetic_leaf(width, height, seed=0, lesions=8):
+    rng = np.random.default_rng(seed)
+    # Low-res par shape banao, phir upscale: 12MP par bhi memory kam lagti hai
+    lw, lh = max(width // 4, 8), max(height // 4, 8)
+    y = np.linspace(-1, 1, lh, dtype=np.float32)[:, None]
+    x = np.linspace(-1, 1, lw, dtype=np.float32)[None, :]
+    leaf = (x / 0.8) ** 2 + (y / 0.55) ** 2 <= 1.0
+
+    base = np.empty((lh, lw, 3), dtype=np.float32)
+    base[...] = (110, 85, 60)  # mitti
+    shade = 0.75 + 0.25 * np.cos(x * 3.0) * np.cos(y * 2.0)
+    green = np.stack([40 * shade, 150 * shade, 50 * shade], axis=-1)
+    base = np.where(leaf[..., None], green, base)
+    vein = leaf & (np.abs(y) < 0.015)
+    base[vein] = (170, 200, 120)
+
+    for _ in range(lesions):
+        cx, cy = rng.uniform(-0.6, 0.6), rng.uniform(-0.4, 0.4)
+        r = rng.uniform(0.03, 0.09)
+        spot = leaf & ((x - cx) ** 2 + (y - cy) ** 2 <= r * r)
+        base[spot] = (90 + rng.integers(0, 40), 60, 30)
+
+    small = Image.fromarray(base.clip(0, 255).astype(np.uint8))
+    pixels = np.asarray(small.resize((width, height), Image.BILINEAR)).copy()
+    pixels += rng.integers(0, 12, pixels.shape, dtype=np.uint8)  # sensor noise (colors <= 200, overflow nahi hota)
+    return Image.fromarray(pixels)
+
+
+def encode(image, fmt="JPEG", quality=90):
+    buf = io.BytesIO()
+    image.save(buf, fmt, quality=quality) if fmt == "JPEG" else image.save(buf, fmt)
+    return buf.getvalue()
+
+
+def synthetic_leaves(count, size=(1600, 1200), seed=0):
+    return [synthetic_leaf(size[0], size[1], seed=seed + i) for i in range(count)]
+
+
+def as_uploads(processor, images):
+    # App wala rasta: JPEG bytes -> Preprocessor.open (draft decode) -> model size
+    return [processor.resize(processor.open(encode(image))) for image in images]
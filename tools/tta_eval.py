@@ -0,0 +1,86 @@
+# --- TTA EVAL: gate se neeche wali photos par TTA on/off — rejection, accuracy, aur p95 latency ---
+# Run from repo root:
+#   python -m tools.tta_eval --images path/to/labeled --variants 4 8
+# Labeled set: har class ka folder (tools.cascade_eval jaisa); bina --images synthetic leaves (sirf rejection/latency)
+import argparse
+import time
+
+import torch
+
+from inference import CONFIDENCE_THRESHOLD, MODEL_PATH, PRECISIONS, load_classifier, predict_probs
+from tools.cascade_eval import load_labeled
+from tools.synthetic import as_uploads, synthetic_leaves
+from tta import VARIANTS, tta_probs
+
+
+def _p(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] * 1000 if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the confidence gate with and without test-time augmentation.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--images", help="Labeled folder (one sub-folder per class); default: synthetic leaves")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--precision", default="fp32", choices=PRECISIONS)
+    parser.add_argument("--variants", type=int, nargs="+", default=[4, len(VARIANTS)])
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD,
+                        help="Gate in percent (lower it to exercise TTA on random weights)")
+    parser.add_argument("--sequential-check", type=int, default=3,
+                        help="Also time N one-by-one forwards for this many images (batched vs sequential)")
+    args = parser.parse_args()
+
+    device = torch.device("cpu")
+    model, processor, _ = load_classifier(args.model_path, device, allow_random_init=True, precision=args.precision)
+    if args.images:
+        samples = load_labeled(args.images, model.config.id2label, args.limit, processor)
+    else:
+        samples = [(img, None) for img in as_uploads(processor, synthetic_leaves(min(args.limit, 24), (640, 480)))]
+    predict_probs(model, processor, [samples[0][0]], device)  # warm-up
+
+    base, base_s = [], []
+    for image, _ in samples:
+        start = time.perf_counter()
+        base.append(predict_probs(model, processor, [image], device)[0])
+        base_s.append(time.perf_counter() - start)
+    below = [i for i, p in enumerate(base) if p.max() * 100 < args.threshold]
+    labeled = [i for i, (_, target) in enumerate(samples) if target is not None]
+    print(f"{len(samples)} images ({len(labeled)} labeled), {len(below)} below the {args.threshold:g}% gate")
+
+    def summary(name, probs, extra_s):
+        accepted = [i for i, p in enumerate(probs) if p.max() * 100 >= args.threshold]
+        right = [i for i in labeled if int(probs[i].argmax()) in samples[i][1]]
+        acc_accepted = [i for i in right if i in accepted]
+        total_s = [b + extra_s.get(i, 0.0) for i, b in enumerate(base_s)]
+        n_acc = len([i for i in labeled if i in accepted])
+        print(f"{name:<12} rejected {1 - len(accepted) / len(probs):6.1%}  "
+              f"accuracy {len(right) / len(labeled) if labeled else float('nan'):6.1%}  "
+              f"accepted-accuracy {len(acc_accepted) / n_acc if n_acc else float('nan'):6.1%}  "
+              f"p50 {_p(total_s, 0.5):7.0f} ms  p95 {_p(total_s, 0.95):7.0f} ms")
+        return _p(total_s, 0.95)
+
+    off_p95 = summary("TTA off", base, {})
+    for n in args.variants:
+        probs, extra_s = list(base), {}
+        for i in below:
+            start = time.perf_counter()
+            probs[i] = torch.from_numpy(tta_probs(model, processor, samples[i][0], device, n))
+            extra_s[i] = time.perf_counter() - start
+        rescued = sum(probs[i].max() * 100 >= args.threshold for i in below)
+        on_p95 = summary(f"TTA x{n}", probs, extra_s)
+        print(f"{'':<12} rescued {rescued}/{len(below)}  added p95 {on_p95 - off_p95:+.0f} ms")
+        if below and args.sequential_check:
+            # Wahi variations ek ek kar ke (jo TTA batch se bachata hai)
+            check = below[:args.sequential_check]
+            batched = sum(extra_s[i] for i in check) / len(check) * 1000
+            start = time.perf_counter()
+            for i in check:
+                for _ in range(n):
+                    predict_probs(model, processor, [samples[i][0]], device)
+            sequential = (time.perf_counter() - start) / len(check) * 1000
+            print(f"{'':<12} batched {batched:.0f} ms vs {n} sequential forwards {sequential:.0f} ms per image")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# --- WEATHER STAND-IN: open-meteo jaisa local server, WeatherService ko network ke baghair check karo ---
+# Run from repo root:
+#   python -m tools.weather_standin            # checks chalao (exit 1 on failure)
+#   python -m tools.weather_standin --serve    # server chalao, phir app ko
+#       PLANT_DOCTOR_WEATHER_URL=http://127.0.0.1:8765/v1/forecast  ke saath start karo
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from weather import FALLBACK, WeatherService, parse_locations
+
+
+class StandIn:
+    def __init__(self, port=0, delay=0.0):
+        self.delay = delay
+        self.fail = False
+        self.requests = 0
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standin.requests += 1
+                time.sleep(standin.delay)
+                if standin.fail:
+                    self.send_error(503)
+                    return
+                query = parse_qs(urlparse(self.path).query)
+                lat = float(query["latitude"][0])
+                body = json.dumps({"current_weather": {"temperature": round(lat, 1), "windspeed": 7.5}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1/forecast"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def run_checks():
+    failures = []
+
+    def check(name, ok):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+        if not ok:
+            failures.append(name)
+
+    standin = StandIn(delay=1.0)
+    farms = parse_locations("Lahore:31.5204,74.3587;Multan:30.1575,71.5249")
+    service = WeatherService(farms, standin.url, ttl=0.5, timeout=3, retry_after=0.3)
+
+    start = time.perf_counter()
+    first = service.get("Lahore")
+    check("first get() does not wait for a slow upstream", time.perf_counter() - start < 0.1)
+    check("first get() serves fallback until data arrives", (first["temp"], first["wind"]) == FALLBACK)
+    check("background refresh fills the cache", wait_for(lambda: service.get("Lahore")["live"]))
+    check("per-location values", service.get("Lahore")["temp"] == 31.5)
+
+    requests_before = standin.requests
+    for _ in range(20):
+        service.get("Multan")
+    wait_for(lambda: service.get("Multan")["live"])
+    check("concurrent misses trigger a single fetch", standin.requests - requests_before == 1)
+
+    time.sleep(0.6)
+    standin.fail = True
+    start = time.perf_counter()
+    stale = service.get("Lahore")
+    check("expired entry is served stale without waiting", time.perf_counter() - start < 0.1 and stale["stale"])
+    wait_for(lambda: not service._refreshing)
+    check("failed refresh keeps last good value", service.get("Lahore")["temp"] == 31.5)
+    requests_before = standin.requests
+    for _ in range(20):
+        service.get("Lahore")
+    check("failing upstream is not retried on every rerun", standin.requests == requests_before)
+
+    standin.fail = False
+    wait_for(lambda: not service.get("Lahore")["stale"])
+    check("stale entry is revalidated in the background", not service.get("Lahore")["stale"])
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed.")
+        return 1
+    print("\nAll weather checks passed.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the open-meteo API.")
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to sleep per request")
+    args = parser.parse_args()
+    if args.serve:
+        standin = StandIn(args.port, args.delay)
+        print(f"Serving {standin.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return
+    sys.exit(run_checks())
+
+
+if __name__ == "__main__":
+    main()
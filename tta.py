@@ -0,0 +1,58 @@
+# --- TEST-TIME AUGMENTATION: gate se neeche wali photo ke variations, ek hi batched forward pass ---
+import numpy as np
+import torch
+
+# Priority order: budget kam ho to pehle wale hi chalte hain (identity hamesha)
+VARIANTS = ("identity", "hflip", "crop_center", "brighter", "vflip", "darker", "crop_top_left", "crop_bottom_right")
+CROP = 0.875  # crop ke baad wapas model size par
+BRIGHTNESS = {"brighter": 1.15, "darker": 0.87}
+
+
+def _brightness_table(factor):
+    return np.clip(np.arange(256) * factor, 0, 255).astype(np.uint8)
+
+
+def _crop(image, anchor, resample):
+    w, h = image.size
+    cw, ch = int(w * CROP), int(h * CROP)
+    x, y = {"crop_center": ((w - cw) // 2, (h - ch) // 2), "crop_top_left": (0, 0),
+            "crop_bottom_right": (w - cw, h - ch)}[anchor]
+    return np.asarray(image.crop((x, y, x + cw, y + ch)).resize(image.size, resample))
+
+
+def variant_arrays(image, n, resample):
+    # Model-size RGB image -> n (3, H, W) uint8 arrays; flips sirf views hain
+    pixels = np.asarray(image)
+    arrays = []
+    for name in VARIANTS[:n]:
+        if name == "identity":
+            variant = pixels
+        elif name == "hflip":
+            variant = pixels[:, ::-1]
+        elif name == "vflip":
+            variant = pixels[::-1]
+        elif name in BRIGHTNESS:
+            variant = np.take(_brightness_table(BRIGHTNESS[name]), pixels)
+        else:
+            variant = _crop(image, name, resample)
+        arrays.append(variant.transpose(2, 0, 1))
+    return arrays
+
+
+def budget_variants(budget_s, single_forward_s, max_variants=len(VARIANTS)):
+    # Batch ka waqt n x single se kam hota hai, is liye ye andaza mehfooz taraf hai
+    if not single_forward_s:
+        return max_variants
+    return int(min(max(budget_s / single_forward_s, 2), max_variants))
+
+
+def tta_probs(model, processor, image, device, n=len(VARIANTS), service=None):
+    # Saare variations ek tensor batch mein, ek forward; logits ka average (= log-probs ka average)
+    pixel_values = processor.normalize_arrays(variant_arrays(processor.resize(image), n, processor.resample))
+    if service is not None:
+        probs = service.infer(pixel_values)[0]
+    else:
+        with torch.no_grad():
+            logits = model(pixel_values=pixel_values.to(device, model.dtype)).logits
+        probs = torch.softmax(logits.float(), dim=-1).cpu()
+    return torch.softmax(probs.clamp_min(1e-12).log().mean(0), dim=-1).numpy()
@@ -0,0 +1,92 @@
+# --- WEATHER SERVICE: TTL cache, background refresh, page kabhi API ka intezar nahi karta ---
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+DEFAULT_LOCATIONS = "Lahore:31.5204,74.3587"
+FALLBACK = (28, 12)  # API na mile to (temp, wind)
+
+
+def parse_locations(text):
+    # "Lahore:31.52,74.35;Multan:30.19,71.47" -> {"Lahore": (31.52, 74.35), ...}
+    locations = OrderedDict()
+    for part in (text or DEFAULT_LOCATIONS).split(";"):
+        if not part.strip():
+            continue
+        name, coords = part.rsplit(":", 1)
+        lat, lon = coords.split(",")
+        locations[name.strip()] = (float(lat), float(lon))
+    return locations
+
+
+class WeatherService:
+    def __init__(self, locations, base_url=OPEN_METEO_URL, ttl=600, timeout=3, fallback=FALLBACK, retry_after=30):
+        self.locations = OrderedDict(locations)
+        self.base_url = base_url
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.timeout = timeout
+        self.fallback = fallback
+        # Ek hi pooled session: har refresh par naya TCP/TLS handshake nahi
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(len(self.locations), 4))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._cache = {}
+        self._refreshing = set()
+        self._attempted = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.failures = 0
+
+    def fetch(self, name):
+        lat, lon = self.locations[name]
+        params = {"latitude": lat, "longitude": lon, "current_weather": "true"}
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        current = response.json()["current_weather"]
+        return current["temperature"], current["windspeed"]
+
+    def refresh(self, name):
+        try:
+            temp, wind = self.fetch(name)
+            with self._lock:
+                self._cache[name] = (temp, wind, time.time())
+                self.fetches += 1
+        except Exception as e:
+            # Purana value rehne do (stale hi sahi), agli baar phir koshish
+            print(f"Weather refresh failed for {name}: {e}")
+            with self._lock:
+                self.failures += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    def _refresh_async(self, name):
+        with self._lock:
+            # API down ho to har rerun par naya request nahi: retry_after seconds ruko
+            if name in self._refreshing or time.time() - self._attempted.get(name, 0) < self.retry_after:
+                return
+            self._refreshing.add(name)
+            self._attempted[name] = time.time()
+        threading.Thread(target=self.refresh, args=(name,), name=f"weather-{name}", daemon=True).start()
+
+    def warm(self):
+        for name in self.locations:
+            self._refresh_async(name)
+
+    def get(self, name):
+        # Foran return: cache (fresh ya stale) ya fallback; purana ho to background refresh
+        with self._lock:
+            cached = self._cache.get(name)
+        age = time.time() - cached[2] if cached else None
+        if cached is None or age > self.ttl:
+            self._refresh_async(name)
+        if cached is None:
+            temp, wind = self.fallback
+            return {"temp": temp, "wind": wind, "live": False, "stale": True, "age": None}
+        return {"temp": cached[0], "wind": cached[1], "live": True, "stale": age > self.ttl, "age": age}